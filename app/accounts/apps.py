@@ -2,4 +2,13 @@ from django.apps import AppConfig
 
 
 class AccountsConfig(AppConfig):
-    name = "accounts"
+    name = "app.accounts"
+    label = "accounts"
+
+    def ready(self):
+        from app.accounts import signals  # noqa: F401
+        from app.accounts.validators import common_passwords
+
+        # Load the list at startup rather than on the first registration; with
+        # a preloading server it is shared by every worker.
+        common_passwords()
@@ -0,0 +1,43 @@
+"""
+Password hashers whose cost comes from the PASSWORD_HASHER_COST setting.
+
+Changing a cost only affects new hashes; Django rehashes a user's stored
+password with the current parameters the next time they log in, as it does
+for hashes made by any hasher other than the first in PASSWORD_HASHERS.
+Hashes are only rehashed when the current cost is at least as strong, so
+lowering a cost (say, on a benchmark host) never weakens stored passwords.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_HASHER_COST["argon2"]["time_cost"]
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_HASHER_COST["argon2"]["memory_cost"]
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_HASHER_COST["argon2"]["parallelism"]
+
+    def must_update(self, encoded):
+        if not super().must_update(encoded):
+            return False
+        _, _, version, time_cost, memory_cost, _, _, _ = self._decode(encoded)
+        if version != self._load_library().low_level.ARGON2_VERSION:
+            return True
+        return self.time_cost >= time_cost and self.memory_cost >= memory_cost
+
+
+class BCryptSHA256PasswordHasher(hashers.BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return settings.PASSWORD_HASHER_COST["bcrypt"]["rounds"]
+
+    def must_update(self, encoded):
+        return int(encoded.split("$")[3]) < self.rounds
@@ -0,0 +1,135 @@
+import csv
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from app.accounts.models import EndUser
+from app.common.helpers import normalize_phone_number
+
+COLUMNS = ("username", "email", "first_name", "last_name", "phone", "password")
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-registers field workers from a CSV file with the columns "
+        f"{', '.join(COLUMNS)} (all but username optional). Existing usernames "
+        "are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row.")
+        parser.add_argument(
+            "--group", help="Add the imported users to this group (created if needed)."
+        )
+        parser.add_argument(
+            "--hashed-passwords",
+            action="store_true",
+            help="The password column already holds Django password hashes.",
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="") as f:
+                rows = list(csv.DictReader(f))
+        except OSError as e:
+            raise CommandError(e)
+        if rows and "username" not in rows[0]:
+            raise CommandError("The CSV file needs a username column.")
+
+        users, phones, skipped = self.build_users(rows, options)
+        created = 0
+        batch_size = options["batch_size"]
+        for start in range(0, len(users), batch_size):
+            created += self.import_batch(
+                users[start : start + batch_size], phones, options["group"]
+            )
+        skipped += len(users) - created
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {created} field workers, skipped {skipped}")
+        )
+
+    def build_users(self, rows, options):
+        """
+        Returns the new users with hashed passwords, a username to phone map
+        and the number of rows rejected up front.
+        """
+        skipped = 0
+        complete = []
+        for line, row in enumerate(rows, start=2):
+            # DictReader fills the columns missing from short rows with None
+            # and collects the surplus of long ones under a None key.
+            if None in row or None in row.values():
+                self.stderr.write(f"Line {line}: wrong number of columns")
+                skipped += 1
+                continue
+            complete.append((line, row))
+        usernames = [row["username"].strip() for _, row in complete]
+        existing = set()
+        for start in range(0, len(usernames), options["batch_size"]):
+            existing.update(
+                User.objects.filter(
+                    username__in=usernames[start : start + options["batch_size"]]
+                ).values_list("username", flat=True)
+            )
+        users = []
+        phones = {}
+        for username, (line, row) in zip(usernames, complete):
+            if not username or username in existing:
+                skipped += 1
+                continue
+            existing.add(username)
+            password = row.get("password") or None
+            if password and not options["hashed_passwords"]:
+                try:
+                    validate_password(password)
+                except ValidationError as e:
+                    self.stderr.write(f"Line {line}: {username}: {' '.join(e)}")
+                    skipped += 1
+                    continue
+                password = make_password(password)
+            users.append(
+                User(
+                    username=username,
+                    email=row.get("email", ""),
+                    first_name=row.get("first_name", ""),
+                    last_name=row.get("last_name", ""),
+                    # Users without a password have to reset it to log in.
+                    password=password or make_password(None),
+                )
+            )
+            if row.get("phone"):
+                phones[username] = normalize_phone_number(row["phone"])
+        return users, phones, skipped
+
+    @staticmethod
+    def import_batch(users, phones, group_name):
+        with transaction.atomic():
+            # Conflicts are users registered since the existence check.
+            User.objects.bulk_create(users, ignore_conflicts=True)
+            # Password hashes are salted, so they tell our rows apart from
+            # ones that won the race.
+            passwords = {user.username: user.password for user in users}
+            created = {
+                username: pk
+                for username, password, pk in User.objects.filter(
+                    username__in=passwords
+                ).values_list("username", "password", "pk")
+                if passwords[username] == password
+            }
+            EndUser.objects.bulk_create(
+                EndUser(phone=phones[username], user_id=pk)
+                for username, pk in created.items()
+                if username in phones
+            )
+            if group_name:
+                group, _ = Group.objects.get_or_create(name=group_name)
+                User.groups.through.objects.bulk_create(
+                    User.groups.through(user_id=pk, group_id=group.pk)
+                    for pk in created.values()
+                )
+        return len(created)
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from app.accounts.models import OneTimePassword
+
+
+class Command(BaseCommand):
+    help = "Deletes one time passwords older than the expiry window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.OTP_EXPIRY_SECONDS,
+            help="Age in seconds after which a code is purged (default: expiry).",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        cutoff = now() - timedelta(seconds=options["older_than"])
+        stale = OneTimePassword.objects.filter(generated_at__lt=cutoff)
+        deleted = 0
+        while True:
+            pks = list(stale.values_list("pk", flat=True)[: options["batch_size"]])
+            if not pks:
+                break
+            deleted += OneTimePassword.objects.filter(pk__in=pks).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} one time passwords"))
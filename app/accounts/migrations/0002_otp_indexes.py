@@ -0,0 +1,23 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="onetimepassword",
+            index=models.Index(
+                fields=["phone", "used", "generated_at"], name="otp_phone_used_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="onetimepassword",
+            index=models.Index(fields=["generated_at"], name="otp_generated_at_idx"),
+        ),
+    ]
@@ -1,6 +1,8 @@
 import math
 import random
+from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils.timezone import now
@@ -23,21 +25,40 @@ class OneTimePassword(models.Model):
     generated_at = models.DateTimeField(auto_now_add=True)
     used = models.BooleanField(default=False)
 
-    @classmethod
-    def generate_otp(cls, phone):
-        phone_number_valid(phone)
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["phone", "used", "generated_at"], name="otp_phone_used_idx"
+            ),
+            models.Index(fields=["generated_at"], name="otp_generated_at_idx"),
+        ]
+
+    @staticmethod
+    def generate_code():
         digits = "0123456789"
         otp = ""
         for i in range(6):
             otp += digits[math.floor(random.random() * 10)]
+        return otp
+
+    @classmethod
+    def generate_otp(cls, phone):
+        phone_number_valid(phone)
+        otp = cls.generate_code()
         cls.objects.create(phone=phone, code=otp)
         return otp
 
+    @classmethod
+    def live(cls, phone):
+        cutoff = now() - timedelta(seconds=settings.OTP_EXPIRY_SECONDS)
+        return cls.objects.filter(phone=phone, used=False, generated_at__gte=cutoff)
+
+    @classmethod
+    def active_otp(cls, phone):
+        return (
+            cls.live(phone).order_by("-generated_at").values_list("code", flat=True)
+        ).first()
+
     @classmethod
     def validate_otp(cls, phone, otp):
-        result = cls.objects.filter(phone=phone).last()
-        if result and result.code == otp:
-            result.used = True
-            result.save()
-            return True
-        return False
+        return bool(cls.live(phone).filter(code=otp).update(used=True))
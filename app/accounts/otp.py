@@ -0,0 +1,51 @@
+"""
+Pluggable storage for one time passwords, selected with the OTP_BACKEND
+setting.
+"""
+
+import hmac
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+from app.accounts.models import OneTimePassword
+from app.common.helpers import phone_number_valid
+
+
+class DatabaseOTPBackend:
+    def get_or_generate(self, phone):
+        return OneTimePassword.active_otp(phone) or OneTimePassword.generate_otp(phone)
+
+    def validate(self, phone, otp):
+        return OneTimePassword.validate_otp(phone, otp)
+
+
+class CacheOTPBackend:
+    """
+    Keeps live codes in the cache with a TTL instead of the database.
+    """
+
+    key = "otp:{}"
+
+    def get_or_generate(self, phone):
+        key = self.key.format(phone)
+        otp = cache.get(key)
+        if otp is None:
+            phone_number_valid(phone)
+            otp = OneTimePassword.generate_code()
+            if not cache.add(key, otp, settings.OTP_EXPIRY_SECONDS):
+                otp = cache.get(key, otp)
+        return otp
+
+    def validate(self, phone, otp):
+        key = self.key.format(phone)
+        expected = cache.get(key)
+        if expected is None or not hmac.compare_digest(expected, otp):
+            return False
+        cache.delete(key)
+        return True
+
+
+def get_otp_backend():
+    return import_string(settings.OTP_BACKEND)()
@@ -0,0 +1,23 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from app.api.authentication import (
+    USER_TOKEN_KEY,
+    invalidate_token,
+    invalidate_user_tokens,
+)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_token(instance.key)
+    cache.delete(USER_TOKEN_KEY.format(instance.user_id))
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user(sender, instance, created, raw, **kwargs):
+    if not created and not raw:
+        invalidate_user_tokens(instance.pk)
@@ -1,3 +1,38 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from app.accounts.models import EndUser
+
+
+class ImportFieldWorkersTests(TestCase):
+    def import_csv(self, text):
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False) as f:
+            f.write(text)
+        self.addCleanup(os.remove, f.name)
+        stdout, stderr = StringIO(), StringIO()
+        call_command("import_field_workers", f.name, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_rows_with_missing_or_extra_columns_are_skipped(self):
+        stdout, stderr = self.import_csv(
+            "username,email,phone\n"
+            "alice,alice@example.com,9000000001\n"
+            "bob\n"
+            "carol,carol@example.com,9000000003,extra\n"
+            "dave,dave@example.com,\n"
+        )
+        self.assertIn("Imported 2 field workers, skipped 2", stdout)
+        self.assertIn("Line 3: wrong number of columns", stderr)
+        self.assertIn("Line 4: wrong number of columns", stderr)
+        self.assertEqual(
+            sorted(User.objects.values_list("username", flat=True)), ["alice", "dave"]
+        )
+        self.assertEqual(
+            list(EndUser.objects.values_list("phone", "user__username")),
+            [("919000000001", "alice")],
+        )
@@ -1,7 +1,10 @@
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 
+USERNAME_TAKEN = "Email is already taken"
+
 
 def get_and_authenticate_user(username, password):
     user = authenticate(username=username, password=password)
@@ -15,12 +18,21 @@ def get_and_authenticate_user(username, password):
 def create_user_account(
     username, email, password, first_name="", last_name="", **extra_fields
 ):
-    user = User.objects.create_user(
-        username=username,
-        email=email,
-        password=password,
-        first_name=first_name,
-        last_name=last_name,
-        **extra_fields
-    )
+    """
+    Creates the user, relying on the unique username constraint so that a
+    concurrent registration for the same name fails validation instead of
+    raising a server error.
+    """
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=password,
+                first_name=first_name,
+                last_name=last_name,
+                **extra_fields
+            )
+    except IntegrityError:
+        raise serializers.ValidationError({"username": [USERNAME_TAKEN]})
     return user
@@ -0,0 +1,27 @@
+import gzip
+from functools import lru_cache
+
+from django.contrib.auth import password_validation
+
+DEFAULT_PASSWORD_LIST_PATH = (
+    password_validation.CommonPasswordValidator.DEFAULT_PASSWORD_LIST_PATH
+)
+
+
+@lru_cache(maxsize=None)
+def common_passwords(path=DEFAULT_PASSWORD_LIST_PATH):
+    """
+    Loads a password list once per process, so every validator instance
+    shares the same set.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return frozenset(line.strip() for line in f)
+    except OSError:
+        with open(path) as f:
+            return frozenset(line.strip() for line in f)
+
+
+class CommonPasswordValidator(password_validation.CommonPasswordValidator):
+    def __init__(self, password_list_path=DEFAULT_PASSWORD_LIST_PATH):
+        self.passwords = common_passwords(password_list_path)
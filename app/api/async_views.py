@@ -0,0 +1,110 @@
+"""
+Coroutine versions of the OTP and Email views, served by the ASGI router in
+app/asgi.py. ORM work reuses the sync views through a thread pool while the
+gateway calls are awaited on the event loop.
+
+The router also serves the issue events stream, which holds its connection
+open for as long as the client listens.
+"""
+
+import httpx
+from django.conf import settings
+from django.http import HttpResponseNotAllowed
+from django.http.response import JsonResponse
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+
+from app.api.views import OTP, Email
+from app.common.asgi import AsyncStreamingHttpResponse, database_sync_to_async
+from app.issues import events
+from app.notifications import mailgun
+from app.notifications.mail import enqueue_email
+from app.notifications.providers import SMSProviderError, get_gateway
+from app.notifications.sms import enqueue_sms
+
+
+async def otp(request):
+    if request.method == "GET":
+        response, message = await database_sync_to_async(OTP.start_request)(request)
+        if message:
+            await deliver_otp(*message)
+        return response
+    if request.method == "POST":
+        return await database_sync_to_async(OTP.post)(request)
+    return HttpResponseNotAllowed(["GET", "POST"])
+
+
+async def deliver_otp(phone, otp_text):
+    if settings.OTP_DELIVERY == "inline":
+        try:
+            await get_gateway().send_async([phone], otp_text)
+            return
+        except SMSProviderError:
+            pass
+    await database_sync_to_async(enqueue_sms)(phone, otp_text)
+
+
+def authenticate(request):
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = authentication_class().authenticate(request)
+        if result is not None:
+            return result[0]
+    return None
+
+
+def unauthorized(error):
+    return JsonResponse({"detail": error}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+async def email(request):
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    try:
+        user = await database_sync_to_async(authenticate)(request)
+    except exceptions.AuthenticationFailed as e:
+        return unauthorized(e.detail)
+    if user is None:
+        return unauthorized(exceptions.NotAuthenticated.default_detail)
+    subject, message = await database_sync_to_async(Email.activation_email)(
+        request, user
+    )
+    await deliver_email(user, subject, message)
+    return JsonResponse({"success": True})
+
+
+async def deliver_email(user, subject, message):
+    if settings.EMAIL_DELIVERY == "inline":
+        try:
+            await mailgun.send_mail_async(subject, message, [user.email])
+            return
+        except (mailgun.MailgunError, httpx.HTTPError):
+            pass
+    await database_sync_to_async(enqueue_email)(user.email, subject, message)
+
+
+async def issue_events(request):
+    """
+    Server-Sent Events stream of status and reviewer changes to the user's
+    issues. EventSource cannot set headers, so the token may be passed as
+    ?token= instead of in the Authorization header.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    token = request.GET.get("token")
+    if token and "HTTP_AUTHORIZATION" not in request.META:
+        # Signed tokens contain the ":" separators of django.core.signing.
+        keyword = "Bearer" if ":" in token else "Token"
+        request.META["HTTP_AUTHORIZATION"] = f"{keyword} {token}"
+    try:
+        user = await database_sync_to_async(authenticate)(request)
+    except exceptions.AuthenticationFailed as e:
+        return unauthorized(e.detail)
+    if user is None:
+        return unauthorized(exceptions.NotAuthenticated.default_detail)
+    response = AsyncStreamingHttpResponse(
+        events.owner_events(user.pk), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
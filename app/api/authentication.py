@@ -0,0 +1,155 @@
+"""
+Token authentication backed by a two level cache.
+
+Resolved users are kept in a small per-process LRU (bounded and with a
+short TTL, since other processes cannot evict from it) in front of the
+shared cache. Entries are dropped when a token is deleted (logout) or its
+user is saved (password change, deactivation), see app.accounts.signals.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+from rest_framework.authtoken.models import Token
+
+TOKEN_KEY = "auth:token:{}"
+USER_TOKEN_KEY = "auth:user-token:{}"
+SIGNED_TOKEN_SALT = "app.api.authentication.SignedTokenAuthentication"
+
+
+class LocalLRU:
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        if not self.max_size or not self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local_tokens = LocalLRU(
+    settings.AUTH_TOKEN_CACHE["LOCAL_MAX_SIZE"], settings.AUTH_TOKEN_CACHE["LOCAL_TTL"]
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        entry = local_tokens.get(key)
+        if entry is None:
+            entry = cache.get(TOKEN_KEY.format(key))
+            if entry is None:
+                entry = super().authenticate_credentials(key)
+                cache.set(
+                    TOKEN_KEY.format(key), entry, settings.AUTH_TOKEN_CACHE["TTL"]
+                )
+            local_tokens.set(key, entry)
+        user, token = entry
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return user, token
+
+
+def invalidate_token(key):
+    local_tokens.delete(key)
+    cache.delete(TOKEN_KEY.format(key))
+
+
+def invalidate_user_tokens(user_id):
+    cache.delete(USER_TOKEN_KEY.format(user_id))
+    for key in Token.objects.filter(user_id=user_id).values_list("key", flat=True):
+        invalidate_token(key)
+
+
+def get_token_key(user):
+    """
+    Returns the user's auth token key, creating the token if needed.
+    """
+    key = cache.get(USER_TOKEN_KEY.format(user.pk))
+    if key is None:
+        key = Token.objects.get_or_create(user=user)[0].key
+        cache.set(USER_TOKEN_KEY.format(user.pk), key, settings.AUTH_TOKEN_CACHE["TTL"])
+    return key
+
+
+def make_signed_token(user):
+    payload = {"id": user.pk, "username": user.username, "is_staff": user.is_staff}
+    return signing.dumps(payload, salt=SIGNED_TOKEN_SALT)
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Stateless "Bearer" tokens signed with SECRET_KEY, valid for
+    AUTH_SIGNED_TOKEN_MAX_AGE seconds and never looked up in the database.
+
+    The authenticated user is built from the token payload and only carries
+    id, username and is_staff, so it must not be saved. Signed tokens cannot
+    be revoked before they expire.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if not settings.AUTH_SIGNED_TOKEN_MAX_AGE:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(_("Invalid token header."))
+        try:
+            payload = signing.loads(
+                auth[1].decode(),
+                salt=SIGNED_TOKEN_SALT,
+                max_age=settings.AUTH_SIGNED_TOKEN_MAX_AGE,
+            )
+        except (signing.BadSignature, UnicodeError):
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        user = User(
+            id=payload["id"],
+            username=payload["username"],
+            is_staff=payload["is_staff"],
+            is_active=True,
+        )
+        user._state.adding = False
+        return user, None
+
+    def authenticate_header(self, request):
+        return self.keyword
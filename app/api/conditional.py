@@ -0,0 +1,31 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def conditional_response(request, etag=None, last_modified=None):
+    """
+    Returns a 304 response if the request's validators match, otherwise None.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+    response = get_conditional_response(
+        request, etag=quote_etag(etag) if etag else None, last_modified=last_modified
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response["ETag"] = quote_etag(etag)
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def make_etag(*parts):
+    return hashlib.md5(":".join(str(part) for part in parts).encode()).hexdigest()
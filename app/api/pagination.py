@@ -1,4 +1,23 @@
-from rest_framework.pagination import PageNumberPagination
+from collections import OrderedDict
+
+from django.core.paginator import InvalidPage, Paginator
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CountedPaginator(Paginator):
+    """
+    Django's Paginator, taking the object count when the caller already has
+    it instead of running COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # Replaces the Paginator.count cached_property.
+            self.count = count
 
 
 class LargeResultsSetPagination(PageNumberPagination):
@@ -11,3 +30,83 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = "page_size"
     max_page_size = 1000
+
+
+class OptionalCountPageNumberPagination(PageNumberPagination):
+    """
+    Page number pagination that skips the COUNT(*) query when the request
+    passes `?count=false`, in which case the response has no `count` and
+    `next` is set if one extra row was found past the page. Callers that
+    already know the row count can pass it as `count` to save the query.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    count_query_param = "count"
+
+    def django_paginator_class(self, queryset, page_size):
+        return CountedPaginator(queryset, page_size, count=self.known_count)
+
+    def paginate_queryset(self, queryset, request, view=None, count=None):
+        self.known_count = count
+        self.skip_count = request.query_params.get(
+            self.count_query_param, ""
+        ).lower() in (
+            "false",
+            "0",
+        )
+        if not self.skip_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise InvalidPage
+        except (InvalidPage, ValueError):
+            raise NotFound(self.invalid_page_message.format(page_number="", message=""))
+        self.request = request
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset : offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.skip_count:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_next_link(self):
+        if not self.skip_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.skip_count:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class IssueCursorPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
@@ -5,5 +5,11 @@ class IsOwner(permissions.BasePermission):
     message = "Not an owner"
 
     def has_object_permission(self, request, view, obj):
-        print("herere", obj.id)
-        return request.user == obj.owner
+        return request.user.pk == obj.owner_id
+
+
+class IsReviewer(permissions.BasePermission):
+    message = "Not a reviewer"
+
+    def has_permission(self, request, view):
+        return request.user.has_perm("issues.change_issue")
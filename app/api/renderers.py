@@ -0,0 +1,55 @@
+"""
+Faster renderers for large responses. ORJSONRenderer is a drop-in
+replacement for DRF's JSONRenderer that falls back to it when orjson is not
+installed, MessagePackRenderer serves `Accept: application/msgpack` (or
+`?format=msgpack`) to clients that want a smaller binary body.
+"""
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # orjson rejects what the json module accepts, such as integers
+            # wider than 64 bits.
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer, so responses can be embedded in <script>.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encoders.JSONEncoder().default)
@@ -1,17 +1,20 @@
+from functools import partial
+
 from django.contrib.auth import password_validation
 from django.contrib.auth.models import BaseUserManager, Group, User
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import routers, serializers, viewsets
-from rest_framework.authtoken.models import Token
+from rest_framework.settings import api_settings
 
 from app.accounts.models import EndUser
+from app.accounts.utils import USERNAME_TAKEN
+from app.api.authentication import get_token_key
 from app.issues.models import Issue, IssueSubType, IssueType
 
 
 # Serializers define the API representation.
 class UserSerializer(serializers.HyperlinkedModelSerializer):
     def create(self, validated_data):
-        print("validated data", validated_data)
-
         user = User.objects.create_user(
             username=validated_data["username"],
             password=validated_data["password"],
@@ -59,13 +62,89 @@ class IssueSubTypeSerializer(serializers.ModelSerializer):
         fields = ["id", "name"]
 
 
-class IssueSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Renders only the fields named in the "fields" context entry, which the
+    view fills from `?fields=` on read requests.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get("fields")
+        if requested:
+            for name in list(fields):
+                if name not in requested:
+                    del fields[name]
+        return fields
+
+
+class ValuesSerializer:
+    """
+    Builds the representation of a read-only `serializer` straight from
+    queryset.values() rows, skipping model instances and DRF's per-field
+    to_representation() for fields whose value is already what the API
+    returns. The output matches `serializer.data`.
+    """
+
+    PLAIN_FIELDS = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.ChoiceField,
+        serializers.IntegerField,
+    )
+
+    def __init__(self, serializer):
+        self.fields = []
+        for field in serializer._readable_fields:
+            column = "__".join(field.source_attrs)
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                column, convert = f"{column}_id", None
+            elif isinstance(field, self.PLAIN_FIELDS):
+                convert = None
+            elif self.is_string_decimal(field):
+                convert = partial(self.decimal_to_representation, field)
+            else:
+                convert = field.to_representation
+            self.fields.append((field.field_name, column, convert))
+        self.columns = [column for _, column, _ in self.fields]
+
+    @staticmethod
+    def is_string_decimal(field):
+        return (
+            isinstance(field, serializers.DecimalField)
+            and not field.localize
+            and getattr(
+                field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING
+            )
+        )
+
+    @staticmethod
+    def decimal_to_representation(field, value):
+        # Column values normally have the field's scale already, in which
+        # case DRF's quantize() would not change them.
+        if value.as_tuple().exponent == -field.decimal_places:
+            return f"{value:f}"
+        return field.to_representation(value)
+
+    def to_representation(self, rows):
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in self.fields:
+                value = row[column]
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+class IssueSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner = serializers.HiddenField(default=serializers.CurrentUserDefault())
     # type = serializers.StringRelatedField()
     # sub_type = serializers.StringRelatedField()
 
     def create(self, validated_data):
-        print(validated_data)
         # validated_data['type'] = IssueType.objects.get(id=validated_data.pop("type"))
         # validated_data['sub_type'] = IssueSubType.objects.get(id=validated_data.pop("sub_type"))
         issue = Issue.objects.create(**validated_data)
@@ -86,6 +165,61 @@ class IssueSerializer(serializers.ModelSerializer):
         ]
 
 
+class ReviewIssueSerializer(IssueSerializer):
+    class Meta(IssueSerializer.Meta):
+        fields = IssueSerializer.Meta.fields + [
+            "priority",
+            "reviewed_by",
+            "lease_expires_at",
+        ]
+        read_only_fields = fields
+
+
+class IssueBulkItemSerializer(serializers.ModelSerializer):
+    """
+    Validates one item of a bulk upload. Types and sub-types are checked
+    against the id sets passed in the context instead of one query per row.
+    """
+
+    type = serializers.IntegerField(required=False, allow_null=True)
+    sub_type = serializers.IntegerField(required=False, allow_null=True)
+    idempotency_key = serializers.CharField(max_length=64, required=False)
+
+    def validate_type(self, value):
+        if value is not None and value not in self.context["type_ids"]:
+            raise serializers.ValidationError(
+                f'Invalid pk "{value}" - object does not exist.'
+            )
+        return value
+
+    def validate_sub_type(self, value):
+        if value is not None and value not in self.context["sub_type_ids"]:
+            raise serializers.ValidationError(
+                f'Invalid pk "{value}" - object does not exist.'
+            )
+        return value
+
+    class Meta:
+        model = Issue
+        fields = [
+            "title",
+            "description",
+            "status",
+            "priority",
+            "type",
+            "sub_type",
+            "longitude",
+            "latitude",
+            "idempotency_key",
+        ]
+        # The model allows blank coordinates but the columns are NOT NULL, so
+        # a missing one would fail the whole chunk's insert.
+        extra_kwargs = {
+            "longitude": {"required": True},
+            "latitude": {"required": True},
+        }
+
+
 class UserLoginSerializer(serializers.Serializer):
     username = serializers.CharField(max_length=100, required=True)
     password = serializers.CharField(required=True, write_only=True)
@@ -109,8 +243,7 @@ class AuthUserSerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "is_active", "is_staff")
 
     def get_auth_token(self, obj):
-        token, _ = Token.objects.get_or_create(user=obj)
-        return token.key
+        return get_token_key(obj)
 
 
 class EmptySerializer(serializers.Serializer):
@@ -125,12 +258,14 @@ class UserRegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ("id", "username", "email", "password", "first_name", "last_name")
+        # Uniqueness is checked once in validate_username() instead of also
+        # by the model's UniqueValidator.
+        extra_kwargs = {"username": {"validators": [UnicodeUsernameValidator()]}}
 
     @staticmethod
     def validate_username(value):
-        user = User.objects.filter(username=value)
-        if user:
-            raise serializers.ValidationError("Email is already taken")
+        if User.objects.filter(username=value).exists():
+            raise serializers.ValidationError(USERNAME_TAKEN)
         return value
 
     @staticmethod
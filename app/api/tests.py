@@ -1,3 +1,367 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from app.accounts.models import OneTimePassword
+from app.api.authentication import (
+    CachedTokenAuthentication,
+    LocalLRU,
+    get_token_key,
+    local_tokens,
+)
+from app.common.testing import QueryBudgetMixin
+from app.issues.models import Issue, IssueSubType, IssueType
+from app.notifications.models import OutboundSMS
+
+
+# Counted on the primary alone; replicas would split the queries across
+# connections.
+@override_settings(DATABASE_REPLICAS=[])
+class IssueQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner@example.com", password="secret")
+        cls.type = IssueType.objects.create(name="Water")
+        cls.sub_type = IssueSubType.objects.create(name="Leak", parent=cls.type)
+        cls.issues = [
+            Issue.objects.create(
+                owner=cls.user,
+                title=f"Leak {index}",
+                description="Pipe burst",
+                type=cls.type,
+                sub_type=cls.sub_type,
+                latitude="12.971599",
+                longitude="77.594566",
+            )
+            for index in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(SERVER_NAME="localhost")
+        self.client.force_authenticate(self.user)
+
+    def test_list(self):
+        response = self.assertEndpointQueries(2, "get", "/api/v1/issues/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 5)
+
+    def test_list_cursor(self):
+        path = "/api/v1/issues/?pagination=cursor&page_size=2"
+        response = self.assertEndpointQueries(1, "get", path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertNotIn("count", response.data)
+
+        response = self.assertEndpointQueries(1, "get", response.data["next"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [issue["id"] for issue in response.data["results"]],
+            [issue.pk for issue in reversed(self.issues[1:3])],
+        )
+
+    def test_list_cursor_not_modified(self):
+        path = "/api/v1/issues/?pagination=cursor&page_size=2"
+        etag = self.client.get(path)["ETag"]
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_retrieve(self):
+        path = f"/api/v1/issues/{self.issues[0].pk}/"
+        response = self.assertEndpointQueries(1, "get", path)
+        self.assertEqual(response.status_code, 200)
+
+    def test_create(self):
+        data = {
+            "title": "Leak",
+            "description": "Pipe burst",
+            "type": self.type.pk,
+            "sub_type": self.sub_type.pk,
+            "latitude": "12.971599",
+            "longitude": "77.594566",
+        }
+        response = self.assertEndpointQueries(
+            8, "post", "/api/v1/issues/", data=data, format="json"
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def test_destroy(self):
+        path = f"/api/v1/issues/{self.issues[0].pk}/"
+        response = self.assertEndpointQueries(5, "delete", path)
+        self.assertEqual(response.status_code, 204)
+
+    def test_issue_types(self):
+        self.client.get("/api/v1/issue-types/")
+        response = self.assertEndpointQueries(0, "get", "/api/v1/issue-types/")
+        self.assertEqual(response.status_code, 200)
+
+
+class IssueGeoQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner@example.com", password="secret")
+
+    def setUp(self):
+        self.client = APIClient(SERVER_NAME="localhost")
+        self.client.force_authenticate(self.user)
+
+    def test_bbox(self):
+        response = self.client.get("/api/v1/issues/?bbox=12,77,13,78")
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_bbox(self):
+        for bbox in (
+            "0,0,inf,inf",
+            "nan,0,1,1",
+            "0,0,1e6,1e6",
+            "-91,0,0,1",
+            "0,-181,1,1",
+            "10,10,0,0",
+            "1,2,3",
+        ):
+            with self.subTest(bbox=bbox):
+                response = self.client.get(f"/api/v1/issues/?bbox={bbox}")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("bbox", response.data)
+
+    def test_invalid_clusters_bbox(self):
+        for bbox in ("0,0,inf,inf", "nan,0,1,1", "0,0,1e6,1e6", "10,10,0,0"):
+            with self.subTest(bbox=bbox):
+                response = self.client.get(f"/api/v1/issues/clusters/?bbox={bbox}")
+                self.assertEqual(response.status_code, 400)
+
+    def test_clusters_zoom_is_clamped(self):
+        response = self.client.get(f"/api/v1/issues/clusters/?zoom={10 ** 30}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["zoom"], 20)
+
+    def test_invalid_near(self):
+        for near in ("nan,nan", "inf,0", "91,0", "0,181"):
+            with self.subTest(near=near):
+                response = self.client.get(f"/api/v1/issues/?near={near}")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("near", response.data)
+
+
+@override_settings(
+    OTP_BACKEND="app.accounts.otp.DatabaseOTPBackend", OTP_DELIVERY="queue"
+)
+class OTPRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(SERVER_NAME="localhost")
+
+    def request_otp(self, phone="9000000001"):
+        return self.client.get("/api/otp/", {"phone": phone})
+
+    def test_duplicate_requests_share_one_send(self):
+        for _ in range(3):
+            response = self.request_otp()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"success": True})
+        self.assertEqual(OneTimePassword.objects.count(), 1)
+        self.assertEqual(OutboundSMS.objects.count(), 1)
+
+    @override_settings(
+        OTP_DEDUPE_SECONDS=0, OTP_RATE_LIMITS={"phone": (2, 600), "ip": (30, 60)}
+    )
+    def test_phone_rate_limit(self):
+        for _ in range(2):
+            self.assertEqual(self.request_otp().status_code, 200)
+        response = self.request_otp()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(0 < int(response["Retry-After"]) <= 600)
+        # Other numbers have their own limit.
+        self.assertEqual(self.request_otp("9000000002").status_code, 200)
+
+    @override_settings(OTP_RATE_LIMITS={"phone": (3, 600), "ip": (2, 60)})
+    def test_ip_rate_limit(self):
+        self.assertEqual(self.request_otp("9000000001").status_code, 200)
+        self.assertEqual(self.request_otp("9000000002").status_code, 200)
+        response = self.request_otp("9000000003")
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertEqual(OutboundSMS.objects.count(), 2)
+
+
+class TokenCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner@example.com", password="secret")
+
+    def setUp(self):
+        cache.clear()
+        local_tokens.clear()
+        self.token = Token.objects.create(user=self.user)
+        self.auth = CachedTokenAuthentication()
+
+    def test_cached_credentials_skip_database(self):
+        self.auth.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual((user, token), (self.user, self.token))
+        # The shared cache answers for processes without a local entry.
+        local_tokens.clear()
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_token_delete_invalidates(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_user_save_invalidates(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_get_token_key(self):
+        self.assertEqual(get_token_key(self.user), self.token.key)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_token_key(self.user), self.token.key)
+
+    def test_local_lru_is_bounded(self):
+        lru = LocalLRU(max_size=2, ttl=60)
+        for key in "abc":
+            lru.set(key, key)
+        self.assertEqual([lru.get(key) for key in "abc"], [None, "b", "c"])
+
+
+class IssueBulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner@example.com", password="secret")
+        cls.type = IssueType.objects.create(name="Water")
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(SERVER_NAME="localhost")
+        self.client.force_authenticate(self.user)
+
+    def item(self, key, **fields):
+        return {
+            "title": "Leak",
+            "description": "Pipe burst",
+            "type": self.type.pk,
+            "latitude": "12.971599",
+            "longitude": "77.594566",
+            "idempotency_key": key,
+            **fields,
+        }
+
+    def post(self, items):
+        return self.client.post("/api/v1/issues/bulk/", items, format="json")
+
+    def test_results_follow_items(self):
+        response = self.post(
+            [
+                self.item("a"),
+                self.item("b", latitude=None),
+                self.item("c", type=0),
+                self.item("a"),
+            ]
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["created"], 1)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["status"] for result in results],
+            ["created", "invalid", "invalid", "exists"],
+        )
+        self.assertIn("latitude", results[1]["errors"])
+        self.assertIn("type", results[2]["errors"])
+        self.assertEqual(results[3]["id"], results[0]["id"])
+
+        issue = Issue.objects.get()
+        self.assertEqual((issue.owner, issue.idempotency_key), (self.user, "a"))
+        self.assertTrue(issue.geohash)
+
+    def test_retry_is_idempotent(self):
+        first = self.post([self.item("a"), self.item("b")])
+        second = self.post([self.item("b"), self.item("c")])
+        self.assertEqual(second.data["created"], 1)
+        self.assertEqual(
+            [result["status"] for result in second.data["results"]],
+            ["exists", "created"],
+        )
+        self.assertEqual(
+            second.data["results"][0]["id"], first.data["results"][1]["id"]
+        )
+        self.assertEqual(Issue.objects.count(), 3)
+
+    @override_settings(ISSUE_BULK_MAX_ITEMS=1)
+    def test_rejects_oversized_and_malformed_bodies(self):
+        self.assertEqual(self.post([self.item("a"), self.item("b")]).status_code, 400)
+        self.assertEqual(self.post(self.item("a")).status_code, 400)
+        self.assertFalse(Issue.objects.exists())
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class IssueStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner@example.com", password="secret")
+        cls.types = [
+            IssueType.objects.create(name="Water"),
+            IssueType.objects.create(name="Power"),
+        ]
+        for issue_type, status in (
+            (cls.types[0], ""),
+            (cls.types[0], "active"),
+            (cls.types[1], "active"),
+        ):
+            Issue.objects.create(
+                owner=cls.user,
+                title="Leak",
+                description="Pipe burst",
+                type=issue_type,
+                latitude="12.971599",
+                longitude="77.594566",
+                status=status,
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient(SERVER_NAME="localhost")
+
+    def test_group_and_filter(self):
+        response = self.client.get("/api/v1/stats/?group_by=status")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["total"], 3)
+        self.assertEqual(
+            response.data["results"],
+            [{"status": "", "count": 1}, {"status": "active", "count": 2}],
+        )
+
+        response = self.client.get(
+            f"/api/v1/stats/?group_by=type&type={self.types[1].pk}"
+        )
+        self.assertEqual(
+            response.data["results"], [{"type": self.types[1].pk, "count": 1}]
+        )
+
+    def test_equivalent_queries_share_cache_entry(self):
+        first, second = self.types[0].pk, self.types[1].pk
+        self.client.get(f"/api/v1/stats/?group_by=type,type&type={second},{first}")
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                f"/api/v1/stats/?type={first},{second}&group_by=type"
+            )
+        self.assertEqual(response.data["total"], 3)
+
+    def test_invalid_parameters(self):
+        for query in (
+            "group_by=owner",
+            "type=water",
+            "since=yesterday",
+            "until=2020-02-30",
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/v1/stats/?{query}")
+                self.assertEqual(response.status_code, 400)
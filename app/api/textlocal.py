@@ -1,17 +1,106 @@
+import json
 import os
 
 import requests
+from requests.adapters import HTTPAdapter
 
-url = "https://api.textlocal.in/send/"
+from app.common.http import get_async_client
+from app.common.instrumentation import track_outbound
 
+url = os.getenv("TEXTLOCAL_URL", "https://api.textlocal.in/send/")
+# Takes a different message per number in one call.
+bulk_url = os.getenv("TEXTLOCAL_BULK_URL", "https://api.textlocal.in/bulk_json/")
+# (connect, read) timeouts in seconds.
+timeout = (3.05, 10)
 
-def send_sms(phone, message):
-    params = {
+# A single keep-alive session per process, so consecutive sends reuse the
+# pooled TCP/TLS connection to the gateway.
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+
+class TextlocalError(Exception):
+    pass
+
+
+def _params(phone, message):
+    if not isinstance(phone, str):
+        phone = ",".join(phone)
+    return {
         "apikey": os.getenv("TEXTLOCAL_API_KEY"),
         "numbers": phone,
         "message": message,
         "sender": "CTZNVS",
         "test": True,
     }
-    response = requests.get(url, params=params)
+
+
+def _json(response):
+    try:
+        return response.json()
+    except ValueError:
+        raise TextlocalError(f"HTTP {response.status_code}: {response.text[:200]}")
+
+
+def _check(response):
+    result = _json(response)
+    if result.get("status") != "success":
+        raise TextlocalError(str(result.get("errors") or result))
     return response.text
+
+
+def send_sms(phone, message):
+    """
+    Sends `message` to one phone number or a list of them in a single call.
+    """
+    with track_outbound("textlocal"):
+        response = session.get(url, params=_params(phone, message), timeout=timeout)
+    return _check(response)
+
+
+def _bulk_failures(result):
+    """
+    Returns the recipients a bulk_json response reports as not sent, as
+    {phone: error}, from errors attached to entries of `messages` or naming
+    a recipient in `errors`.
+    """
+    failed = {}
+    for entry in result.get("messages") or ():
+        if entry.get("errors"):
+            recipient = entry.get("recipient") or entry.get("number")
+            failed[str(recipient)] = str(entry["errors"])
+    for error in result.get("errors") or ():
+        recipient = error.get("recipient") or error.get("number")
+        if recipient:
+            failed[str(recipient)] = error.get("message") or str(error)
+    return failed
+
+
+def send_bulk_sms(messages):
+    """
+    Sends a list of (phone, message) pairs in a single call. Returns the
+    phones Textlocal rejected as {phone: error}, and raises TextlocalError
+    when the whole call failed.
+    """
+    data = {
+        "sender": "CTZNVS",
+        "messages": [{"number": phone, "text": text} for phone, text in messages],
+        "test": True,
+    }
+    params = {"apikey": os.getenv("TEXTLOCAL_API_KEY"), "data": json.dumps(data)}
+    with track_outbound("textlocal"):
+        response = session.post(bulk_url, data=params, timeout=timeout)
+    result = _json(response)
+    failed = _bulk_failures(result)
+    if result.get("status") != "success" and not failed:
+        raise TextlocalError(str(result.get("errors") or result))
+    return failed
+
+
+async def send_sms_async(phone, message):
+    """
+    Non-blocking `send_sms` for use from ASGI coroutines.
+    """
+    with track_outbound("textlocal"):
+        response = await get_async_client().get(url, params=_params(phone, message))
+    return _check(response)
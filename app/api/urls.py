@@ -11,10 +11,13 @@ router = routers.DefaultRouter()
 router.register(r"issues", views.IssueViewSet, basename="")
 router.register(r"issue-types", views.IssueTypeViewSet)
 router.register(r"issue-sub-types", views.IssueSubTypeViewSet)
+router.register(r"stats", views.IssueStatsViewSet, basename="issue-stats")
+router.register(r"review-queue", views.ReviewQueueViewSet, basename="review-queue")
 router.register(r"auth", views.AuthViewSet, basename="user-auth")
 
 urlpatterns = [
     path("v1/", include(router.urls)),
     path("otp/", views.OTP.as_view()),
     path("email/", views.Email.as_view()),
+    path("activate/<uidb64>/<token>/", views.Activate.as_view(), name="activate"),
 ]
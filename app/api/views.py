@@ -1,39 +1,76 @@
+import hashlib
+import json
+import math
+from datetime import datetime
+from smtplib import SMTPException
+
+from django.conf import settings
 from django.contrib.auth import logout
 from django.contrib.auth.models import Group, User
 from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Count, Max, Q, Sum
+from django.http import Http404, StreamingHttpResponse
 from django.http.response import JsonResponse
 from django.template.loader import render_to_string
-from django.utils.encoding import force_bytes
-from django.utils.http import urlsafe_base64_encode
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.timezone import is_naive, make_aware
 from django.views import View
 from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.mixins import CreateModelMixin
 from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
 from rest_framework.views import APIView
 
-from app.accounts.models import EndUser, OneTimePassword
+from app.accounts.models import EndUser
+from app.accounts.otp import get_otp_backend
 from app.accounts.tokens import account_activation_token
 from app.accounts.utils import create_user_account, get_and_authenticate_user
 from app.api import pagination
-from app.api.permissions import IsOwner
+from app.api.authentication import make_signed_token
+from app.api.conditional import conditional_response, make_etag, set_validators
+from app.api.permissions import IsOwner, IsReviewer
 from app.api.serializers import (
     AuthUserSerializer,
     EmptySerializer,
     EndUserSerializer,
     GroupSerializer,
+    IssueBulkItemSerializer,
     IssueSerializer,
     IssueTypeSerializer,
     IssueSubTypeSerializer,
     PasswordChangeSerializer,
+    ReviewIssueSerializer,
     UserLoginSerializer,
     UserRegisterSerializer,
     UserSerializer,
+    ValuesSerializer,
 )
-from app.api.textlocal import send_sms
+from app.common import db_router
+from app.common.geo import MAX_ZOOM, geohash_cover, zoom_to_precision
 from app.common.helpers import normalize_phone_number
-from app.issues.models import Issue, IssueSubType, IssueType
+from app.common.ratelimit import FixedWindowLimit
+from app.issues import export, review, taxonomy
+from app.issues.bulk import bulk_create_issues
+from app.issues.search import get_search_backend
+from app.issues.models import (
+    STATUS_CHOICES,
+    TILE_PRECISIONS,
+    Issue,
+    IssueStats,
+    IssueSubType,
+    IssueTile,
+    IssueType,
+)
+from app.notifications.mail import EmailDeliveryError, enqueue_email
+from app.notifications.providers import SMSProviderError, get_gateway
+from app.notifications.sms import enqueue_sms
 
 
 class UserViewSet(viewsets.ModelViewSet, CreateModelMixin):
@@ -79,32 +116,505 @@ class IssueViewSet(viewsets.ModelViewSet):
 
     serializer_class = IssueSerializer
     permission_classes = [IsOwner]
+    pagination_class = pagination.OptionalCountPageNumberPagination
+
+    @property
+    def paginator(self):
+        """
+        Switches to keyset pagination when the client asks for it with
+        `?pagination=cursor` or is following a cursor link.
+        """
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            if "cursor" in params or params.get("pagination") == "cursor":
+                self._paginator = pagination.IssueCursorPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
 
     def get_queryset(self):
-        return Issue.objects.filter(owner=self.request.user)
+        queryset = Issue.objects.filter(owner=self.request.user).order_by(
+            "-created_at", "-id"
+        )
+        if self.action in ("list", "retrieve"):
+            # Only load the columns the serializer renders, plus the
+            # ordering column cursor pagination reads.
+            fields = self.requested_fields() or self.get_serializer_class().Meta.fields
+            queryset = queryset.only("created_at", "updated_at", *fields)
+        elif self.action == "destroy":
+            queryset = queryset.only("id", "owner", *Issue.TRACKED_FIELDS)
+        params = self.request.query_params
+        if params.get("bbox"):
+            bbox = self._parse_bbox("bbox", params["bbox"])
+            queryset = queryset.within_bbox(*bbox)
+        if params.get("near"):
+            latitude, longitude = self._parse_floats("near", params["near"], 2)
+            self._check_point("near", latitude, longitude)
+            (radius_km,) = self._parse_floats(
+                "radius_km", params.get("radius_km", "5"), 1
+            )
+            if not 0 < radius_km <= settings.ISSUE_NEAR_MAX_RADIUS_KM:
+                raise ValidationError(
+                    {
+                        "radius_km": "Must be greater than zero and at most "
+                        f"{settings.ISSUE_NEAR_MAX_RADIUS_KM}"
+                    }
+                )
+            queryset = queryset.near(latitude, longitude, radius_km)
+        if params.get("q"):
+            queryset = get_search_backend().search(queryset, params["q"])
+        return queryset
+
+    def requested_fields(self):
+        """
+        Returns the field names asked for with `?fields=` on read requests,
+        or None to render every field.
+        """
+        value = self.request.query_params.get("fields")
+        if not value or self.request.method not in permissions.SAFE_METHODS:
+            return None
+        fields = [name.strip() for name in value.split(",") if name.strip()]
+        readable = self.get_serializer_class()()._readable_fields
+        unknown = set(fields) - {field.field_name for field in readable}
+        if unknown:
+            raise ValidationError(
+                {"fields": f"Unknown fields: {', '.join(sorted(unknown))}"}
+            )
+        return fields
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.requested_fields()
+        return context
+
+    def representation_etag(self, *parts):
+        """
+        Returns an ETag for `parts` as rendered for the current user, URL
+        (query string included) and negotiated media type.
+        """
+        request = self.request
+        return make_etag(
+            request.user.pk,
+            request.get_full_path(),
+            request.accepted_media_type,
+            *parts,
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Rows are rendered straight from values(), see ValuesSerializer.
+        serializer = ValuesSerializer(self.get_serializer())
+        if isinstance(self.paginator, pagination.IssueCursorPagination):
+            return self.list_cursor_page(queryset, serializer)
+
+        # Any save bumps the newest updated_at and a delete lowers the
+        # count, so the list can be validated without rendering it. There is
+        # no Last-Modified, as a date alone would miss deletes.
+        summary = queryset.aggregate(last_updated=Max("updated_at"), count=Count("id"))
+        etag = self.representation_etag(summary["last_updated"], summary["count"])
+        response = conditional_response(request, etag)
+        if response is not None:
+            return response
+
+        rows = queryset.values("created_at", *serializer.columns)
+        page = self.paginator.paginate_queryset(
+            rows, request, view=self, count=summary["count"]
+        )
+        if page is not None:
+            response = self.get_paginated_response(serializer.to_representation(page))
+        else:
+            response = Response(serializer.to_representation(rows))
+        return set_validators(response, etag)
+
+    def list_cursor_page(self, queryset, serializer):
+        """
+        Lists one keyset page. A cursor pins the page's position, so it is
+        validated by its own rows' ids and updated_at, without counting the
+        whole result.
+        """
+        columns = dict.fromkeys(["id", "created_at", "updated_at", *serializer.columns])
+        page = self.paginate_queryset(queryset.values(*columns))
+        etag = self.representation_etag(
+            *((row["id"], row["updated_at"]) for row in page)
+        )
+        response = conditional_response(self.request, etag)
+        if response is not None:
+            return response
+        response = self.get_paginated_response(serializer.to_representation(page))
+        return set_validators(response, etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        issue = self.get_object()
+        etag = self.representation_etag(issue.updated_at.isoformat())
+        last_modified = int(issue.updated_at.timestamp())
+        response = conditional_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        response = Response(self.get_serializer(issue).data)
+        return set_validators(response, etag, last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Issues are private to their owner, so shared caches must key
+        # responses on the credentials too.
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def clusters(self, request):
+        params = request.query_params
+        try:
+            zoom = int(params.get("zoom", 10))
+        except ValueError:
+            raise ValidationError({"zoom": "Must be an integer"})
+        zoom = max(0, min(zoom, MAX_ZOOM))
+        # Tiles cover every user's issues, so only staff see cells fine or
+        # sparse enough to single out one report.
+        if request.user.is_staff:
+            max_precision, min_count = max(TILE_PRECISIONS), 1
+        else:
+            max_precision = settings.ISSUE_CLUSTERS_PUBLIC_MAX_PRECISION
+            min_count = settings.ISSUE_CLUSTERS_PUBLIC_MIN_COUNT
+        precision = zoom_to_precision(zoom, max_precision)
+        tiles = IssueTile.objects.filter(precision=precision, count__gt=0)
+        if params.get("bbox"):
+            cells = Q()
+            for prefix in geohash_cover(*self._parse_bbox("bbox", params["bbox"])):
+                cells |= Q(cell__startswith=prefix[:precision])
+            tiles = tiles.filter(cells)
+
+        clusters = {}
+        for tile in tiles.values(
+            "cell", "status", "count", "latitude_sum", "longitude_sum"
+        ):
+            cluster = clusters.setdefault(
+                tile["cell"],
+                {"cell": tile["cell"], "count": 0, "statuses": {}, "lat": 0, "lng": 0},
+            )
+            cluster["count"] += tile["count"]
+            cluster["statuses"][tile["status"]] = tile["count"]
+            cluster["lat"] += tile["latitude_sum"]
+            cluster["lng"] += tile["longitude_sum"]
+        clusters = [
+            cluster for cluster in clusters.values() if cluster["count"] >= min_count
+        ]
+        for cluster in clusters:
+            cluster["latitude"] = round(cluster.pop("lat") / cluster["count"], 6)
+            cluster["longitude"] = round(cluster.pop("lng") / cluster["count"], 6)
+
+        data = {"zoom": zoom, "precision": precision, "clusters": clusters}
+        return Response(data=data, status=status.HTTP_200_OK)
+
+    @action(
+        methods=["POST"],
+        detail=False,
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"detail": "Expected a list of issues"})
+        if len(items) > settings.ISSUE_BULK_MAX_ITEMS:
+            raise ValidationError(
+                {
+                    "detail": f"At most {settings.ISSUE_BULK_MAX_ITEMS} issues per request"
+                }
+            )
+        _, payload = taxonomy.get_taxonomy()
+        context = {
+            "type_ids": {item["id"] for item in payload["types"]},
+            "sub_type_ids": {item["id"] for item in payload["sub_types"]},
+        }
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = IssueBulkItemSerializer(data=item, context=context)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {"status": "invalid", "errors": serializer.errors}
+        created = bulk_create_issues(request.user, [dict(row) for _, row in valid])
+        for (index, _), (issue_id, is_new) in zip(valid, created):
+            results[index] = {
+                "status": "created" if is_new else "exists",
+                "id": issue_id,
+            }
+
+        data = {
+            "created": sum(1 for _, is_new in created if is_new),
+            "results": results,
+        }
+        return Response(data=data, status=status.HTTP_200_OK)
 
+    @action(
+        methods=["GET"],
+        detail=False,
+        permission_classes=[permissions.IsAdminUser],
+    )
+    def export(self, request):
+        """
+        Streams every issue as NDJSON (default) or CSV with
+        `?export_format=csv`, optionally filtered by `status` (comma
+        separated), `type` and a `created_after` / `created_before` range.
+        """
+        params = request.query_params
+        export_format = params.get("export_format", "ndjson")
+        if export_format not in ("ndjson", "csv"):
+            raise ValidationError({"export_format": "Expected ndjson or csv"})
+        queryset = Issue.objects.using(db_router.replica_alias())
+        if params.get("status"):
+            queryset = queryset.filter(status__in=params["status"].split(","))
+        if params.get("type"):
+            queryset = queryset.filter(type_id=self._parse_int("type", params["type"]))
+        for name, lookup in (("created_after", "gte"), ("created_before", "lt")):
+            if params.get(name):
+                value = self._parse_datetime(name, params[name])
+                queryset = queryset.filter(**{f"created_at__{lookup}": value})
+
+        if export_format == "csv":
+            response = StreamingHttpResponse(
+                export.csv_lines(queryset), content_type="text/csv"
+            )
+        else:
+            response = StreamingHttpResponse(
+                export.ndjson_lines(queryset), content_type="application/x-ndjson"
+            )
+        response["Content-Disposition"] = (
+            f'attachment; filename="issues.{export_format}"'
+        )
+        return response
+
+    @staticmethod
+    def _parse_datetime(name, value):
+        # parse_datetime() and parse_date() return None for malformed values
+        # and raise ValueError for well formed but invalid ones.
+        try:
+            parsed = parse_datetime(value) or parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: "Expected an ISO 8601 date or datetime"})
+        if not isinstance(parsed, datetime):
+            parsed = datetime.combine(parsed, datetime.min.time())
+        if is_naive(parsed):
+            parsed = make_aware(parsed)
+        return parsed
 
-class IssueTypeViewSet(viewsets.ModelViewSet):
+    @staticmethod
+    def _parse_int(name, value):
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: "Expected an integer"})
+
+    @staticmethod
+    def _parse_floats(name, value, count):
+        try:
+            values = [float(part) for part in value.split(",")]
+        except ValueError:
+            values = []
+        if len(values) != count or not all(map(math.isfinite, values)):
+            raise ValidationError({name: f"Expected {count} comma separated numbers"})
+        return values
+
+    @staticmethod
+    def _check_point(name, latitude, longitude):
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError(
+                {name: "Latitude must be within ±90 and longitude within ±180"}
+            )
+
+    @classmethod
+    def _parse_bbox(cls, name, value):
+        min_lat, min_lng, max_lat, max_lng = cls._parse_floats(name, value, 4)
+        cls._check_point(name, min_lat, min_lng)
+        cls._check_point(name, max_lat, max_lng)
+        if min_lat > max_lat or min_lng > max_lng:
+            raise ValidationError({name: "Expected min_lat,min_lng,max_lat,max_lng"})
+        return min_lat, min_lng, max_lat, max_lng
+
+
+class CachedTaxonomyMixin:
+    """
+    Serves list and retrieve from the cached taxonomy, with ETag and
+    Last-Modified validators for conditional requests.
+    """
+
+    taxonomy_key = None
+
+    def list(self, request, *args, **kwargs):
+        (etag, last_modified), payload = taxonomy.get_taxonomy()
+        response = conditional_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        items = payload[self.taxonomy_key]
+        page = self.paginate_queryset(items)
+        if page is not None:
+            response = self.get_paginated_response(page)
+        else:
+            response = Response(items)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        (etag, last_modified), payload = taxonomy.get_taxonomy()
+        response = conditional_response(request, etag, last_modified)
+        if response is not None:
+            return response
+        pk = str(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        for item in payload[self.taxonomy_key]:
+            if str(item["id"]) == pk:
+                return set_validators(Response(item), etag, last_modified)
+        raise Http404
+
+
+class IssueTypeViewSet(CachedTaxonomyMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows issue types to be viewed or edited.
     """
 
-    queryset = IssueType.objects.all()
+    taxonomy_key = "types"
+    queryset = IssueType.objects.prefetch_related("child_issue_type")
     serializer_class = IssueTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = pagination.StandardResultsSetPagination
 
 
-class IssueSubTypeViewSet(viewsets.ModelViewSet):
+class IssueSubTypeViewSet(CachedTaxonomyMixin, viewsets.ModelViewSet):
     """
     API endpoint that allows issue sub-types to be viewed or edited.
     """
 
+    taxonomy_key = "sub_types"
     queryset = IssueSubType.objects.all()
     serializer_class = IssueSubTypeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
+class ReviewQueueViewSet(viewsets.GenericViewSet):
+    """
+    Lets reviewers claim issues one at a time, most urgent and oldest first.
+    """
+
+    queryset = Issue.objects.none()
+    serializer_class = ReviewIssueSerializer
+    permission_classes = [permissions.IsAuthenticated, IsReviewer]
+    lookup_value_regex = r"\d+"
+
+    @action(methods=["POST"], detail=False)
+    def next(self, request):
+        issue = review.claim_next(request.user)
+        if issue is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(self.get_serializer(issue).data)
+
+    @action(methods=["POST"], detail=True)
+    def complete(self, request, pk=None):
+        reviewed_statuses = [
+            choice
+            for choice, label in STATUS_CHOICES
+            if choice != settings.REVIEW_QUEUE_STATUS
+        ]
+        new_status = request.data.get("status")
+        if new_status not in reviewed_statuses:
+            raise ValidationError(
+                {"status": [f"Must be one of: {', '.join(reviewed_statuses)}."]}
+            )
+        issue = review.complete(request.user, pk, new_status)
+        if issue is None:
+            return self.not_claimed()
+        return Response(self.get_serializer(issue).data)
+
+    @action(methods=["POST"], detail=True)
+    def release(self, request, pk=None):
+        if not review.release(request.user, pk):
+            return self.not_claimed()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def not_claimed():
+        return Response(
+            {"detail": "This issue is not claimed by you."},
+            status=status.HTTP_409_CONFLICT,
+        )
+
+
+class IssueStatsViewSet(viewsets.ViewSet):
+    """
+    Read-only API endpoint over the issue statistics rollup.
+
+    Counts are grouped by the comma separated `group_by` dimensions (day,
+    type, status, priority, cell; default day) and can be filtered by
+    `since` / `until` dates, `type`, `status`, `priority` and a `cell`
+    geohash prefix.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    dimensions = ("day", "type", "status", "priority", "cell")
+
+    def list(self, request):
+        group_by, filters = self.parse_query(request.query_params)
+        query = json.dumps([group_by, filters], sort_keys=True)
+        cache_key = f"issues:stats:{hashlib.sha256(query.encode()).hexdigest()}"
+        data = cache.get(cache_key)
+        if data is None:
+            data = self.aggregate(group_by, filters)
+            cache.set(cache_key, data, settings.ISSUE_STATS_MAX_AGE)
+        response = Response(data=data, status=status.HTTP_200_OK)
+        patch_cache_control(response, public=True, max_age=settings.ISSUE_STATS_MAX_AGE)
+        return response
+
+    def parse_query(self, params):
+        """
+        Validates the query parameters. Returns the group_by dimensions and
+        the filters as {lookup: value}, normalised so that equivalent queries
+        share a cache entry.
+        """
+        group_by = [name for name in params.get("group_by", "day").split(",") if name]
+        unknown = set(group_by) - set(self.dimensions)
+        if unknown:
+            raise ValidationError(
+                {"group_by": f"Unknown dimensions: {', '.join(sorted(unknown))}"}
+            )
+        filters = {}
+        for name, lookup in (("since", "gte"), ("until", "lte")):
+            if params.get(name):
+                try:
+                    day = parse_date(params[name])
+                except ValueError:
+                    day = None
+                if day is None:
+                    raise ValidationError({name: "Expected an ISO 8601 date"})
+                filters[f"day__{lookup}"] = day.isoformat()
+        if params.get("type"):
+            try:
+                types = {int(value) for value in params["type"].split(",")}
+            except ValueError:
+                raise ValidationError({"type": "Expected comma separated integers"})
+            filters["type__in"] = sorted(types)
+        for name in ("status", "priority"):
+            if params.get(name):
+                filters[f"{name}__in"] = sorted(set(params[name].split(",")))
+        if params.get("cell"):
+            filters["cell__startswith"] = params["cell"]
+        return list(dict.fromkeys(group_by)), filters
+
+    def aggregate(self, group_by, filters):
+        stats = IssueStats.objects.using(db_router.replica_alias()).filter(**filters)
+        rows = stats.values(*group_by).annotate(total=Sum("count")).order_by(*group_by)
+        results = []
+        for row in rows:
+            row["count"] = row.pop("total")
+            if "day" in row:
+                row["day"] = row["day"].isoformat()
+            results.append(row)
+        return {"total": sum(row["count"] for row in results), "results": results}
+
+
 class AuthViewSet(viewsets.GenericViewSet):
     permission_classes = [permissions.AllowAny]
     serializer_class = EmptySerializer
@@ -120,6 +630,8 @@ class AuthViewSet(viewsets.GenericViewSet):
         serializer.is_valid(raise_exception=True)
         user = get_and_authenticate_user(**serializer.validated_data)
         data = AuthUserSerializer(user).data
+        if settings.AUTH_SIGNED_TOKEN_MAX_AGE:
+            data["signed_token"] = make_signed_token(user)
         return Response(data=data, status=status.HTTP_200_OK)
 
     def get_serializer_class(self):
@@ -169,29 +681,77 @@ class AuthViewSet(viewsets.GenericViewSet):
 class OTP(View):
     # authentication_classes = [permissions.AllowAny]
 
-    @staticmethod
-    def get(request):
+    @classmethod
+    def get(cls, request):
+        response, message = cls.start_request(request)
+        if message:
+            cls.deliver(*message)
+        return response
+
+    @classmethod
+    def start_request(cls, request):
+        """
+        Rate limits, de-duplicates and records an OTP request. Returns the
+        response and the (phone, text) message to deliver, if any.
+        """
         phone = request.GET.get("phone")
         if phone:
             phone = normalize_phone_number(phone)
-            existing_user = EndUser.objects.filter(phone=phone).first()
-            if existing_user:
-                if existing_user.user:
-                    return JsonResponse(
-                        {"username": existing_user.user.username, "success": True}
-                    )
-                return JsonResponse({"success": False, "error": "OTP verified"})
-            otp_text = "OTP for CVC19 is {}"
-            existing_otp = OneTimePassword.objects.filter(
-                phone=phone, used=False
-            ).first()
-            if existing_otp:
-                otp_text = otp_text.format(existing_otp)
-            else:
-                otp_text = otp_text.format(OneTimePassword.generate_otp(phone))
-            send_sms(phone, otp_text)
-            return JsonResponse({"success": True})
-        return JsonResponse({"error": "invalid input", "success": False})
+            limited = cls.rate_limit(request, "ip", BaseThrottle().get_ident(request))
+            if limited:
+                return limited, None
+            # Duplicate requests inside the window share the first one's send
+            # and get its response once it is available.
+            dedupe_key = f"otp:inflight:{phone}"
+            if not cache.add(dedupe_key, None, settings.OTP_DEDUPE_SECONDS):
+                return JsonResponse(cache.get(dedupe_key) or {"success": True}), None
+            limited = cls.rate_limit(request, "phone", phone)
+            if limited:
+                cache.delete(dedupe_key)
+                return limited, None
+            try:
+                data, otp_text = cls.request_otp(phone)
+            except Exception:
+                cache.delete(dedupe_key)
+                raise
+            cache.set(dedupe_key, data, settings.OTP_DEDUPE_SECONDS)
+            return JsonResponse(data), (phone, otp_text) if otp_text else None
+        return JsonResponse({"error": "invalid input", "success": False}), None
+
+    @staticmethod
+    def request_otp(phone):
+        existing_user = EndUser.objects.filter(phone=phone).first()
+        if existing_user:
+            if existing_user.user:
+                return {"username": existing_user.user.username, "success": True}, None
+            return {"success": False, "error": "OTP verified"}, None
+        otp_text = "OTP for CVC19 is {}".format(
+            get_otp_backend().get_or_generate(phone)
+        )
+        return {"success": True}, otp_text
+
+    @staticmethod
+    def deliver(phone, otp_text):
+        if settings.OTP_DELIVERY == "inline":
+            try:
+                get_gateway().send([phone], otp_text)
+                return
+            except SMSProviderError:
+                pass
+        enqueue_sms(phone, otp_text)
+
+    @staticmethod
+    def rate_limit(request, name, identity):
+        limit = FixedWindowLimit(f"otp:{name}", *settings.OTP_RATE_LIMITS[name])
+        allowed, retry_after = limit.consume(identity)
+        if allowed:
+            return None
+        response = JsonResponse(
+            {"error": "too many requests", "success": False},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+        response["Retry-After"] = str(math.ceil(retry_after))
+        return response
 
     @staticmethod
     def post(request):
@@ -199,7 +759,7 @@ class OTP(View):
         otp = request.POST.get("otp")
         if phone and otp:
             phone = normalize_phone_number(phone)
-            if OneTimePassword.validate_otp(phone, otp):
+            if get_otp_backend().validate(phone, otp):
                 EndUser.objects.get_or_create(phone=phone)
                 return JsonResponse({"success": True})
             return JsonResponse({"error": "incorrect OTP", "success": False})
@@ -207,9 +767,27 @@ class OTP(View):
 
 
 class Email(APIView):
-    @staticmethod
-    def get(request):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @classmethod
+    def get(cls, request):
         user = request.user
+        subject, message = cls.activation_email(request, user)
+        cls.deliver(user, subject, message)
+        return Response({"success": True})
+
+    @staticmethod
+    def deliver(user, subject, message):
+        if settings.EMAIL_DELIVERY == "inline":
+            try:
+                user.email_user(subject, message)
+                return
+            except (SMTPException, OSError, EmailDeliveryError):
+                pass
+        enqueue_email(user.email, subject, message)
+
+    @staticmethod
+    def activation_email(request, user):
         current_site = get_current_site(request)
         subject = "Activate Your MySite Account"
         message = render_to_string(
@@ -221,11 +799,25 @@ class Email(APIView):
                 "token": account_activation_token.make_token(user),
             },
         )
-        user.email_user(subject, message)
-        # send_mail(
-        #     "Subject here",
-        #     "Here is the message.",
-        #     "hello@penciljar.studio",
-        #     ["arjunmunji@gmail.com"],
-        #     fail_silently=False,
-        # )
+        return subject, message
+
+
+class Activate(APIView):
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    @staticmethod
+    def get(request, uidb64, token):
+        try:
+            user = User.objects.get(pk=force_str(urlsafe_base64_decode(uidb64)))
+        except (TypeError, ValueError, OverflowError, User.DoesNotExist):
+            user = None
+        if user is None or not account_activation_token.check_token(user, token):
+            return Response(
+                {"error": "invalid activation link", "success": False},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not user.is_active:
+            user.is_active = True
+            user.save(update_fields=["is_active"])
+        return Response({"success": True})
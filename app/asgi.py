@@ -13,4 +13,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once the app registry is ready.
+from app.api import async_views  # noqa: E402
+from app.common.asgi import AsyncRouter  # noqa: E402
+
+application = AsyncRouter(
+    django_application,
+    {
+        "/api/otp/": async_views.otp,
+        "/api/email/": async_views.email,
+        "/api/v1/issue-events/": async_views.issue_events,
+    },
+)
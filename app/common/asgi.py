@@ -0,0 +1,124 @@
+"""
+Native ASGI routes for endpoints that spend most of their time waiting on
+external gateways.
+
+Django 3.0 runs every view on a single sync thread under ASGI, so a view
+blocked on an SMS or email API stalls the whole worker. Paths registered
+with `AsyncRouter` are served by coroutines instead; everything else falls
+through to the regular Django handler.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import RequestAborted
+from django.core.handlers.exception import response_for_exception
+from django.db import close_old_connections
+from django.http.response import HttpResponseBase
+
+
+def database_sync_to_async(func):
+    """
+    Like `sync_to_async`, but runs `func` in the thread pool with stale
+    database connections closed around it, since it runs outside Django's
+    request/response cycle.
+    """
+
+    def inner(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(inner, thread_sensitive=False)
+
+
+class AsyncStreamingHttpResponse(HttpResponseBase):
+    """
+    A response whose body is sent chunk by chunk from the async iterator
+    `stream` until it is exhausted or the client disconnects.
+    """
+
+    streaming = True
+
+    def __init__(self, stream, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream = stream
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+class AsyncRouter:
+    """
+    Dispatches HTTP requests whose path is in `routes` to `async def
+    view(request)` coroutines and everything else to `handler`, a Django
+    ASGIHandler. Middleware is not applied to the async routes, which may
+    return an `AsyncStreamingHttpResponse` for long-lived responses.
+    """
+
+    def __init__(self, handler, routes):
+        self.handler = handler
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        view = self.routes.get(scope["path"]) if scope["type"] == "http" else None
+        if view is None:
+            return await self.handler(scope, receive, send)
+        try:
+            body_file = await self.handler.read_body(receive)
+        except RequestAborted:
+            return
+        try:
+            request, response = self.handler.create_request(scope, body_file)
+            if request is not None:
+                try:
+                    request.get_host()
+                    response = await view(request)
+                except Exception as e:
+                    response = response_for_exception(request, e)
+            if isinstance(response, AsyncStreamingHttpResponse):
+                await self.send_stream(response, receive, send)
+            else:
+                await self.handler.send_response(response, send)
+        finally:
+            body_file.close()
+
+    async def send_stream(self, response, receive, send):
+        headers = [
+            (name.encode("latin1"), value.encode("latin1"))
+            for name, value in response.items()
+        ]
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": headers,
+            }
+        )
+
+        async def pump():
+            async for chunk in response.stream:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body"})
+
+        tasks = [
+            asyncio.ensure_future(pump()),
+            asyncio.ensure_future(wait_for_disconnect(receive)),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            if hasattr(response.stream, "aclose"):
+                await response.stream.aclose()
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
@@ -0,0 +1,32 @@
+"""
+Cache backends that report hits and misses to the request instrumentation.
+"""
+
+from django.core.cache.backends import locmem, memcached
+
+from app.common.instrumentation import record_cache_lookup
+
+_missing = object()
+
+
+class InstrumentedCacheMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _missing, version)
+        if value is _missing:
+            record_cache_lookup(0, 1)
+            return default
+        record_cache_lookup(1, 0)
+        return value
+
+
+class LocMemCache(InstrumentedCacheMixin, locmem.LocMemCache):
+    # get_many() is implemented on top of get(), so it is already counted.
+    pass
+
+
+class MemcachedCache(InstrumentedCacheMixin, memcached.MemcachedCache):
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super().get_many(keys, version)
+        record_cache_lookup(len(values), len(keys) - len(values))
+        return values
@@ -0,0 +1,142 @@
+"""
+Routes reads to the read replicas listed in the DATABASE_REPLICAS setting.
+
+Only reads made while serving a safe (GET, HEAD, OPTIONS) request go to a
+replica, and only until the request writes. A client that wrote is also
+kept on the primary for DATABASE_REPLICA_STICKY_SECONDS, long enough for
+the replicas to catch up, so it reads its own writes. Everything outside a
+request (workers, management commands) uses the primary, unless pinned to
+a replica with `use_replica()` or `queryset.using(replica_alias())` for
+reads that can tolerate lag.
+"""
+
+import hashlib
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_KEY = "db:sticky:{}"
+# Read from the primary even on safe requests: a client must be able to use
+# a token or session right after it was created.
+PRIMARY_MODELS = {"authtoken.token", "sessions.session"}
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PRIMARY = "primary"
+REPLICA = "replica"
+
+
+class RoutingState:
+    def __init__(self, primary):
+        self.primary = primary
+        self.replica = None
+        self.wrote = False
+
+
+_state = ContextVar("db_routing_state", default=None)
+_pin = ContextVar("db_routing_pin", default=None)
+
+
+def replica_alias():
+    """
+    Returns the alias of a replica, or of the primary if none is configured.
+    """
+    if not settings.DATABASE_REPLICAS:
+        return DEFAULT_DB_ALIAS
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def _pinned(target):
+    token = _pin.set(target)
+    try:
+        yield
+    finally:
+        _pin.reset(token)
+
+
+def use_replica():
+    return _pinned(REPLICA)
+
+
+def use_primary():
+    return _pinned(PRIMARY)
+
+
+@contextmanager
+def routing(primary):
+    state = RoutingState(primary)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS:
+            return None
+        if model._meta.label_lower in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        pin = _pin.get()
+        state = _state.get()
+        if pin == PRIMARY or (pin is None and (state is None or state.primary)):
+            return DEFAULT_DB_ALIAS
+        if state is None:
+            return replica_alias()
+        # Stay on one replica for the whole request.
+        if state.replica is None:
+            state.replica = replica_alias()
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.primary = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas only need the schema. Data migrations (RunPython, RunSQL)
+        # have no model name and would write through to the primary.
+        if db in settings.DATABASE_REPLICAS and model_name is None:
+            return False
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def sticky_key(request):
+    """
+    Identifies the client by its credentials: the Authorization header or
+    the session cookie.
+    """
+    credential = request.META.get("HTTP_AUTHORIZATION") or request.COOKIES.get(
+        settings.SESSION_COOKIE_NAME
+    )
+    if not credential:
+        return None
+    return STICKY_KEY.format(hashlib.sha256(credential.encode()).hexdigest())
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        key = sticky_key(request)
+        primary = request.method not in SAFE_METHODS or bool(key and cache.get(key))
+        with routing(primary) as state:
+            response = self.get_response(request)
+        if state.wrote and key:
+            cache.set(key, True, settings.DATABASE_REPLICA_STICKY_SECONDS)
+        return response
@@ -0,0 +1,125 @@
+import math
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = 111.32
+# Deepest web map zoom level.
+MAX_ZOOM = 20
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    latitude, longitude = float(latitude), float(longitude)
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        if even:
+            value, interval = longitude, lng_range
+        else:
+            value, interval = latitude, lat_range
+        mid = (interval[0] + interval[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            interval[0] = mid
+        else:
+            bits = bits << 1
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+def geohash_cell_size(precision):
+    """
+    Returns the (latitude, longitude) span in degrees of a cell at `precision`.
+    """
+    total_bits = precision * 5
+    lng_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def _frange(start, stop, step):
+    value = start
+    while value < stop:
+        yield value
+        value += step
+    yield stop
+
+
+def geohash_cover(min_lat, min_lng, max_lat, max_lng, max_cells=32):
+    """
+    Returns the geohash prefixes covering a bounding box, using the finest
+    precision that needs no more than `max_cells` cells.
+
+    The box is clamped to the world, so at worst the whole world is covered
+    with the 32 cells of precision 1. Raises ValueError for coordinates that
+    are not finite.
+    """
+    if not all(map(math.isfinite, (min_lat, min_lng, max_lat, max_lng))):
+        raise ValueError("Bounding box coordinates must be finite")
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 90.0)
+    min_lng, max_lng = max(min_lng, -180.0), min(max_lng, 180.0)
+    if min_lat > max_lat or min_lng > max_lng:
+        return []
+    lat_span = max_lat - min_lat
+    lng_span = max_lng - min_lng
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        cell_lat, cell_lng = geohash_cell_size(candidate)
+        rows = math.ceil(lat_span / cell_lat) + 1
+        cols = math.ceil(lng_span / cell_lng) + 1
+        if rows * cols <= max_cells:
+            precision = candidate
+            break
+    cell_lat, cell_lng = geohash_cell_size(precision)
+    cells = set()
+    for lat in _frange(min_lat, max_lat, cell_lat):
+        for lng in _frange(min_lng, max_lng, cell_lng):
+            cells.add(geohash_encode(lat, lng, precision))
+    return sorted(cells)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Returns (min_lat, min_lng, max_lat, max_lng) enclosing a circle of
+    `radius_km` around the given point.
+    """
+    latitude, longitude = float(latitude), float(longitude)
+    lat_delta = radius_km / KM_PER_DEGREE_LATITUDE
+    cos_lat = math.cos(math.radians(latitude))
+    if cos_lat < 1e-6:
+        lng_delta = 180.0
+    else:
+        lng_delta = min(radius_km / (KM_PER_DEGREE_LATITUDE * cos_lat), 180.0)
+    return (
+        max(latitude - lat_delta, -90.0),
+        max(longitude - lng_delta, -180.0),
+        min(latitude + lat_delta, 90.0),
+        min(longitude + lng_delta, 180.0),
+    )
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, map(float, (lat1, lng1, lat2, lng2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def zoom_to_precision(zoom, max_precision=7):
+    """
+    Maps a web map zoom level (0 to MAX_ZOOM) to the geohash precision whose
+    cells are roughly a few screen tiles wide at that zoom.
+    """
+    return max(1, min(max_precision, (int(zoom) + 2) // 3 + 1))
@@ -1,3 +1,5 @@
+from django.db import DEFAULT_DB_ALIAS, connections
+
 from app.common.conf import PHONE_NUMBER_VALIDATOR
 
 
@@ -14,3 +16,15 @@ def normalize_phone_number(phone):
     if len(phone) == 10:
         phone = f"91{phone}"
     return phone
+
+
+def bulk_batch_size(model, batch_size, using=DEFAULT_DB_ALIAS):
+    """
+    Caps a bulk_create `batch_size` at what the database accepts in a single
+    INSERT. Django 3.0 uses an explicit batch size as is, which overruns
+    SQLite's limits on query parameters and compound SELECT terms.
+    """
+    fields = model._meta.concrete_fields
+    return min(
+        batch_size, connections[using].ops.bulk_batch_size(fields, [None] * batch_size)
+    )
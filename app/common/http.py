@@ -0,0 +1,21 @@
+import asyncio
+import weakref
+
+import httpx
+
+# (connect, read/write/pool) timeouts in seconds, matching the sync clients.
+TIMEOUT = httpx.Timeout(10.0, connect=3.05)
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Returns the pooled `httpx.AsyncClient` for the running event loop, so
+    concurrent requests share keep-alive connections to each gateway.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(timeout=TIMEOUT)
+    return client
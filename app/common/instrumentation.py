@@ -0,0 +1,147 @@
+"""
+Per-request instrumentation: wall time, database queries, cache lookups and
+outbound HTTP time are recorded for every request and exported through
+app.common.metrics. Sending the X-Profile header returns a cProfile report
+for that single request instead of its response.
+
+Both the metrics endpoint and profiling require METRICS_TOKEN (as a bearer
+token or the X-Profile value) when it is set. Without it they are closed in
+production and limited to client addresses in INTERNAL_IPS elsewhere.
+"""
+
+import cProfile
+import io
+import pstats
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from app.common import metrics
+
+PROFILE_LINES = 60
+
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.outbound_calls = 0
+        self.outbound_time = 0.0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def record_cache_lookup(hits, misses):
+    stats = _current.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+@contextmanager
+def track_outbound(service):
+    """
+    Times a call to an external service, attributing it to the current
+    request if there is one.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.OUTBOUND_DURATION.labels(service).observe(elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.outbound_calls += 1
+            stats.outbound_time += elapsed
+
+
+def is_internal(request, credential):
+    if settings.METRICS_TOKEN:
+        return constant_time_compare(credential or "", settings.METRICS_TOKEN)
+    if not settings.METRICS_ALLOW_INTERNAL_IPS:
+        return False
+    return request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+
+
+def metrics_view(request):
+    credential = request.META.get("HTTP_AUTHORIZATION", "")[len("Bearer ") :]
+    if not is_internal(request, credential):
+        return HttpResponseForbidden()
+    body, content_type = metrics.render()
+    return HttpResponse(body, content_type=content_type)
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        profile = "HTTP_X_PROFILE" in request.META and is_internal(
+            request, request.META["HTTP_X_PROFILE"]
+        )
+        profiler = cProfile.Profile() if profile else None
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats.record_query))
+                if profiler:
+                    response = profiler.runcall(self.get_response, request)
+                else:
+                    response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - started
+
+        match = request.resolver_match
+        route = match.route if match else "unmatched"
+        metrics.REQUEST_DURATION.labels(
+            route, request.method, response.status_code
+        ).observe(elapsed)
+        metrics.REQUEST_DB_QUERIES.labels(route, request.method).observe(stats.queries)
+        metrics.REQUEST_DB_DURATION.labels(route, request.method).observe(stats.db_time)
+        metrics.REQUEST_OUTBOUND_DURATION.labels(route, request.method).observe(
+            stats.outbound_time
+        )
+        if stats.cache_hits:
+            metrics.CACHE_LOOKUPS.labels(route, "hit").inc(stats.cache_hits)
+        if stats.cache_misses:
+            metrics.CACHE_LOOKUPS.labels(route, "miss").inc(stats.cache_misses)
+
+        if profiler:
+            return self.profile_response(request, response, profiler, stats, elapsed)
+        return response
+
+    @staticmethod
+    def profile_response(request, response, profiler, stats, elapsed):
+        report = io.StringIO()
+        report.write(
+            f"{request.method} {request.get_full_path()} -> {response.status_code} "
+            f"in {elapsed * 1000:.1f}ms\n"
+            f"db: {stats.queries} queries, {stats.db_time * 1000:.1f}ms\n"
+            f"cache: {stats.cache_hits} hits, {stats.cache_misses} misses\n"
+            f"outbound: {stats.outbound_calls} calls, "
+            f"{stats.outbound_time * 1000:.1f}ms\n\n"
+        )
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(
+            PROFILE_LINES
+        )
+        return HttpResponse(report.getvalue(), content_type="text/plain")
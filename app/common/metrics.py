@@ -0,0 +1,64 @@
+"""
+Prometheus metrics collected by the instrumentation middleware.
+
+Each process keeps its own values. Under a multi-worker server, set the
+prometheus_multiproc_dir environment variable to a shared empty directory
+so the metrics endpoint aggregates every worker.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float("inf"))
+
+REQUEST_DURATION = Histogram(
+    "django_http_request_duration_seconds",
+    "Wall time spent handling requests.",
+    ["route", "method", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "django_http_request_db_queries",
+    "Database queries run per request.",
+    ["route", "method"],
+    buckets=QUERY_BUCKETS,
+)
+REQUEST_DB_DURATION = Histogram(
+    "django_http_request_db_duration_seconds",
+    "Time per request spent in database queries.",
+    ["route", "method"],
+)
+REQUEST_OUTBOUND_DURATION = Histogram(
+    "django_http_request_outbound_duration_seconds",
+    "Time per request spent waiting on outbound HTTP calls.",
+    ["route", "method"],
+)
+CACHE_LOOKUPS = Counter(
+    "django_cache_lookups_total",
+    "Cache lookups by request route and result.",
+    ["route", "result"],
+)
+OUTBOUND_DURATION = Histogram(
+    "outbound_http_duration_seconds",
+    "Duration of calls to external services.",
+    ["service"],
+)
+
+
+def render():
+    """
+    Returns (body, content type) for the current metric values.
+    """
+    registry = REGISTRY
+    if os.getenv("prometheus_multiproc_dir"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,45 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+
+class FixedWindowLimit:
+    """
+    Request counter kept in the cache, so limits are shared by every worker
+    using the same cache backend.
+
+    Allows `limit` requests per identity in each `period` second window.
+    Counts are taken with `cache.add()` and `cache.incr()`, which are atomic
+    on memcached, so concurrent requests cannot both take the last slot.
+    """
+
+    def __init__(self, name, limit, period):
+        self.name = name
+        self.limit = limit
+        self.period = period
+
+    def key(self, identity, window):
+        # Hashed so arbitrary identities (phone numbers, forwarded
+        # addresses) make valid memcached keys and are not stored in clear.
+        digest = hashlib.sha256(str(identity).encode()).hexdigest()
+        return f"ratelimit:{self.name}:{digest}:{window}"
+
+    def consume(self, identity, tokens=1):
+        """
+        Counts `tokens` requests for `identity`. Returns a tuple of
+        (allowed, seconds until the current window ends).
+        """
+        current_time = time.time()
+        window = int(current_time // self.period)
+        key = self.key(identity, window)
+        cache.add(key, 0, self.period)
+        try:
+            count = cache.incr(key, tokens)
+        except ValueError:
+            # The key expired between add() and incr().
+            cache.add(key, tokens, self.period)
+            count = tokens
+        if count <= self.limit:
+            return True, 0
+        return False, (window + 1) * self.period - current_time
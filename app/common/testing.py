@@ -0,0 +1,27 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin for pinning the number of queries an endpoint runs, so
+    that N+1 regressions fail the build.
+
+        response = self.assertEndpointQueries(3, "get", "/api/v1/issues/")
+    """
+
+    def assertEndpointQueries(self, expected, method, path, client=None, **kwargs):
+        client = client or self.client
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method.lower())(path, **kwargs)
+        executed = len(context.captured_queries)
+        if executed != expected:
+            queries = "\n".join(
+                f"{index}. {query['sql']}"
+                for index, query in enumerate(context.captured_queries, start=1)
+            )
+            self.fail(
+                f"{method.upper()} {path} ran {executed} queries, expected "
+                f"{expected}:\n{queries}"
+            )
+        return response
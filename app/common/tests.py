@@ -0,0 +1,147 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from app.common.db_router import (
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    routing,
+    use_primary,
+    use_replica,
+)
+from app.common.geo import geohash_cover
+from app.common.instrumentation import metrics_view
+from app.common.ratelimit import FixedWindowLimit
+from app.issues.models import Issue
+
+
+@override_settings(DATABASE_REPLICAS=["replica1"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def test_safe_request_reads_from_replica(self):
+        with routing(primary=False):
+            self.assertEqual(self.router.db_for_read(Issue), "replica1")
+
+    def test_primary_models_read_from_primary(self):
+        with routing(primary=False), use_replica():
+            self.assertEqual(self.router.db_for_read(Token), DEFAULT_DB_ALIAS)
+
+    def test_write_moves_request_to_primary(self):
+        with routing(primary=False):
+            self.assertEqual(self.router.db_for_write(Issue), DEFAULT_DB_ALIAS)
+            self.assertEqual(self.router.db_for_read(Issue), DEFAULT_DB_ALIAS)
+
+    def test_outside_request_reads_from_primary_unless_pinned(self):
+        self.assertEqual(self.router.db_for_read(Issue), DEFAULT_DB_ALIAS)
+        with use_replica():
+            self.assertEqual(self.router.db_for_read(Issue), "replica1")
+        with routing(primary=False), use_primary():
+            self.assertEqual(self.router.db_for_read(Issue), DEFAULT_DB_ALIAS)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_leaves_reads_to_default(self):
+        with routing(primary=False):
+            self.assertIsNone(self.router.db_for_read(Issue))
+
+    def get(self, middleware, authorization):
+        return middleware(self.factory.get("/", HTTP_AUTHORIZATION=authorization))
+
+    def test_client_reads_its_writes(self):
+        def view(request):
+            if request.method == "POST":
+                self.router.db_for_write(Issue)
+            return self.router.db_for_read(Issue)
+
+        middleware = ReplicaRoutingMiddleware(view)
+        self.assertEqual(self.get(middleware, "Token a"), "replica1")
+        post = self.factory.post("/", HTTP_AUTHORIZATION="Token a")
+        self.assertEqual(middleware(post), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.get(middleware, "Token a"), DEFAULT_DB_ALIAS)
+        # Other clients are not affected.
+        self.assertEqual(self.get(middleware, "Token b"), "replica1")
+
+    @override_settings(DATABASE_REPLICA_STICKY_SECONDS=0)
+    def test_sticky_window_expires(self):
+        def view(request):
+            self.router.db_for_write(Issue)
+            return self.router.db_for_read(Issue)
+
+        middleware = ReplicaRoutingMiddleware(view)
+        middleware(self.factory.post("/", HTTP_AUTHORIZATION="Token a"))
+        middleware = ReplicaRoutingMiddleware(
+            lambda request: self.router.db_for_read(Issue)
+        )
+        self.assertEqual(self.get(middleware, "Token a"), "replica1")
+
+
+class GeohashCoverTests(SimpleTestCase):
+    def test_world_is_covered_by_precision_one(self):
+        cells = geohash_cover(-90, -180, 90, 180)
+        self.assertEqual(len(cells), 32)
+        self.assertTrue(all(len(cell) == 1 for cell in cells))
+
+    def test_box_is_clamped_to_the_world(self):
+        self.assertEqual(geohash_cover(0, 0, 1e6, 1e6), geohash_cover(0, 0, 90, 180))
+
+    def test_inverted_box_covers_nothing(self):
+        self.assertEqual(geohash_cover(10, 10, 0, 0), [])
+
+    def test_rejects_coordinates_that_are_not_finite(self):
+        for value in (float("inf"), float("nan")):
+            with self.assertRaises(ValueError):
+                geohash_cover(0, 0, value, 1)
+
+
+class MetricsAccessTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, **extra):
+        return metrics_view(self.factory.get("/internal/metrics", **extra))
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_token(self):
+        self.assertEqual(self.get(HTTP_AUTHORIZATION="Bearer secret").status_code, 200)
+        self.assertEqual(self.get(HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        # A token, once set, is required from internal addresses too.
+        self.assertEqual(self.get(REMOTE_ADDR="127.0.0.1").status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None, METRICS_ALLOW_INTERNAL_IPS=True)
+    def test_internal_ips_without_token(self):
+        self.assertEqual(self.get(REMOTE_ADDR="127.0.0.1").status_code, 200)
+        self.assertEqual(self.get(REMOTE_ADDR="203.0.113.7").status_code, 403)
+
+    @override_settings(METRICS_TOKEN=None, METRICS_ALLOW_INTERNAL_IPS=False)
+    def test_production_without_token_is_closed(self):
+        self.assertEqual(self.get(REMOTE_ADDR="127.0.0.1").status_code, 403)
+
+
+@mock.patch("app.common.ratelimit.time")
+class FixedWindowLimitTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.limit = FixedWindowLimit("test", 2, 60)
+
+    def test_limit_per_window(self, time):
+        time.time.return_value = 1000.0
+        self.assertEqual(self.limit.consume("a"), (True, 0))
+        self.assertEqual(self.limit.consume("a"), (True, 0))
+        # The window started at 960, so the next one starts in 20 seconds.
+        self.assertEqual(self.limit.consume("a"), (False, 20.0))
+        self.assertEqual(self.limit.consume("b"), (True, 0))
+
+        time.time.return_value = 1020.0
+        self.assertEqual(self.limit.consume("a"), (True, 0))
+
+    def test_key_does_not_hold_identity(self, time):
+        key = self.limit.key("+91 90000 00001", 16)
+        self.assertTrue(key.startswith("ratelimit:test:"))
+        self.assertNotIn("90000", key)
+        self.assertNotIn(" ", key)
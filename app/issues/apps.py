@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 
 class IssuesConfig(AppConfig):
-    name = "issues"
+    name = "app.issues"
+    label = "issues"
+
+    def ready(self):
+        from app.issues import signals  # noqa: F401
@@ -0,0 +1,83 @@
+import uuid
+
+from django.db import IntegrityError, transaction
+
+from app.issues.models import Issue
+from app.issues.signals import issues_bulk_created
+
+CHUNK_SIZE = 500
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _existing_ids(owner, keys):
+    existing = {}
+    for chunk in _chunks(list(keys), CHUNK_SIZE):
+        existing.update(
+            Issue.objects.filter(owner=owner, idempotency_key__in=chunk).values_list(
+                "idempotency_key", "id"
+            )
+        )
+    return existing
+
+
+def bulk_create_issues(owner, rows, chunk_size=CHUNK_SIZE):
+    """
+    Inserts validated issue rows for `owner` with bulk_create, one
+    transaction per chunk. Rows whose idempotency_key already exists for the
+    owner, or repeats an earlier row's key, are not inserted again.
+
+    Returns a list aligned with `rows` of (issue id, created) tuples.
+    """
+    keys = [row.pop("idempotency_key", None) or uuid.uuid4().hex for row in rows]
+    ids = _existing_ids(owner, keys)
+    pending = {}
+    for key, row in zip(keys, rows):
+        if key in ids or key in pending:
+            continue
+        issue = Issue(
+            owner=owner,
+            idempotency_key=key,
+            type_id=row.pop("type", None),
+            sub_type_id=row.pop("sub_type", None),
+            **row
+        )
+        issue.set_geohash()
+        issue.set_priority_rank()
+        pending[key] = issue
+
+    created = set()
+    for chunk in _chunks(list(pending.values()), chunk_size):
+        try:
+            with transaction.atomic():
+                _insert(owner, chunk)
+        except IntegrityError:
+            # Lost a race with a concurrent request using the same keys.
+            ids.update(_existing_ids(owner, [issue.idempotency_key for issue in chunk]))
+            chunk = [issue for issue in chunk if issue.idempotency_key not in ids]
+            with transaction.atomic():
+                _insert(owner, chunk)
+        for issue in chunk:
+            ids[issue.idempotency_key] = issue.pk
+            created.add(issue.idempotency_key)
+
+    results = []
+    for key in keys:
+        results.append((ids[key], key in created))
+        # Only the first row with a given key counts as created.
+        created.discard(key)
+    return results
+
+
+def _insert(owner, issues):
+    if not issues:
+        return
+    Issue.objects.bulk_create(issues)
+    # Not every backend (MySQL) returns primary keys from bulk inserts.
+    ids = _existing_ids(owner, [issue.idempotency_key for issue in issues])
+    for issue in issues:
+        issue.pk = ids[issue.idempotency_key]
+    issues_bulk_created.send(sender=Issue, issues=issues)
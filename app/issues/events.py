@@ -0,0 +1,197 @@
+"""
+Issue change events pushed to owners over Server-Sent Events.
+
+Saves publish to the backend named by the ISSUE_EVENTS_BACKEND setting once
+the transaction commits (see app.issues.signals). Each process fans events
+out to its connected streams through an in-process `Hub`:
+InMemoryBackend delivers straight to it, which is enough when writes and
+streams are served by the same process (development, tests), while
+RedisBackend relays through Redis pub/sub so every node sees every write.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+OWNER_CHANNEL = "issues:owner:{}"
+# Events buffered per stream; a client that falls further behind misses
+# events and should refetch when it reconnects.
+MAX_PENDING_EVENTS = 100
+KEEPALIVE_SECONDS = 15
+RETRY_MILLISECONDS = 5000
+# Backoff between attempts to resubscribe after losing Redis.
+RECONNECT_MIN_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+class Hub:
+    """
+    Fans messages published from any thread out to the asyncio queues of
+    the streams subscribed to their channel.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_event_loop(), asyncio.Queue(MAX_PENDING_EVENTS))
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+    def dispatch(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_put, queue, message)
+            except RuntimeError:
+                # The stream's event loop has been closed.
+                pass
+
+
+def _put(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+class InMemoryBackend:
+    def __init__(self, hub):
+        self.hub = hub
+
+    def start(self):
+        pass
+
+    def publish(self, channel, message):
+        self.hub.dispatch(channel, message)
+
+
+class RedisBackend:
+    """
+    Publishes to Redis and relays every issue channel back into the local
+    hub from a listener thread started with the first stream.
+
+    Losing Redis drops events rather than failing saves: publish errors are
+    logged, and the listener resubscribes with exponential backoff.
+    """
+
+    prefix = "cvc19:"
+
+    def __init__(self, hub):
+        import redis
+
+        self.hub = hub
+        self.client = redis.Redis.from_url(settings.ISSUE_EVENTS_REDIS_URL)
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self.listen, daemon=True)
+                self._listener.start()
+
+    def listen(self):
+        import redis
+
+        delay = RECONNECT_MIN_SECONDS
+        while True:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.prefix + OWNER_CHANNEL.format("*"))
+                delay = RECONNECT_MIN_SECONDS
+                for item in pubsub.listen():
+                    channel = item["channel"].decode()[len(self.prefix) :]
+                    self.hub.dispatch(channel, json.loads(item["data"]))
+            except redis.RedisError:
+                logger.warning(
+                    "Lost the issue events subscription, retrying in %ss",
+                    delay,
+                    exc_info=True,
+                )
+            finally:
+                pubsub.close()
+            time.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+
+    def publish(self, channel, message):
+        import redis
+
+        try:
+            self.client.publish(self.prefix + channel, json.dumps(message))
+        except redis.RedisError:
+            logger.exception("Could not publish the issue event to %s", channel)
+
+
+hub = Hub()
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.ISSUE_EVENTS_BACKEND)(hub)
+        return _backend
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    global _backend
+    if setting == "ISSUE_EVENTS_BACKEND":
+        _backend = None
+
+
+def issue_event(issue):
+    return {
+        "id": issue.pk,
+        "status": issue.status,
+        "reviewed_by": issue.reviewed_by_id,
+    }
+
+
+def publish(owner_id, message):
+    get_backend().publish(OWNER_CHANNEL.format(owner_id), message)
+
+
+def format_event(message):
+    return f"event: issue\ndata: {json.dumps(message)}\n\n".encode()
+
+
+async def owner_events(owner_id):
+    """
+    Yields the Server-Sent Events stream of changes to `owner_id`'s issues,
+    with a comment every KEEPALIVE_SECONDS to keep proxies from closing it.
+    """
+    get_backend().start()
+    async with hub.subscribe(OWNER_CHANNEL.format(owner_id)) as queue:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n".encode()
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+            else:
+                yield format_event(message)
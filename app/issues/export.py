@@ -0,0 +1,60 @@
+"""
+Streaming issue export. Rows are read with values() in keyset pages of
+CHUNK_SIZE ids and encoded one at a time, so memory use does not grow with
+the size of the export, even on MySQL where iterator() buffers the whole
+result set in the client.
+"""
+
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = [
+    "id",
+    "title",
+    "description",
+    "status",
+    "priority",
+    "type_id",
+    "sub_type_id",
+    "owner_id",
+    "reviewed_by_id",
+    "latitude",
+    "longitude",
+    "created_at",
+]
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object whose write() returns the value, for csv.writer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset):
+    queryset = queryset.order_by("id").values_list(*EXPORT_FIELDS)
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id)[:CHUNK_SIZE])
+        yield from rows
+        if len(rows) < CHUNK_SIZE:
+            return
+        # "id" is the first export field.
+        last_id = rows[-1][0]
+
+
+def ndjson_lines(queryset):
+    encoder = DjangoJSONEncoder()
+    for row in export_rows(queryset):
+        yield encoder.encode(dict(zip(EXPORT_FIELDS, row))) + "\n"
+
+
+def csv_lines(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in export_rows(queryset):
+        yield writer.writerow(row)
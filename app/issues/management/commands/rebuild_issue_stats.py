@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from app.issues.models import IssueStats
+
+
+class Command(BaseCommand):
+    help = "Recomputes the daily issue statistics rollup from the issues table."
+
+    def handle(self, *args, **options):
+        IssueStats.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {IssueStats.objects.count()} issue stats rows")
+        )
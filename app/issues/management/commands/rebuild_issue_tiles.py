@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from app.issues.models import IssueTile
+
+
+class Command(BaseCommand):
+    help = "Recomputes the per-zoom issue cluster tiles from the issues table."
+
+    def handle(self, *args, **options):
+        IssueTile.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {IssueTile.objects.count()} issue tiles")
+        )
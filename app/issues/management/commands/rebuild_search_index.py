@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from app.issues.models import Issue
+from app.issues.search import get_search_backend
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Re-indexes every issue with the configured search backend."
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        issues = Issue.objects.only("id", "title", "description").order_by("id")
+        batch = []
+        for issue in issues.iterator(chunk_size=BATCH_SIZE):
+            batch.append(issue)
+            if len(batch) == BATCH_SIZE:
+                backend.index(batch)
+                batch = []
+        if batch:
+            backend.index(batch)
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
@@ -0,0 +1,55 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+from app.common.geo import geohash_encode
+
+
+def populate_geohash(apps, schema_editor):
+    Issue = apps.get_model("issues", "Issue")
+    issues = Issue.objects.exclude(latitude=None).exclude(longitude=None)
+    for issue in issues.only("id", "latitude", "longitude").iterator():
+        issue.geohash = geohash_encode(issue.latitude, issue.longitude)
+        issue.save(update_fields=["geohash"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0005_auto_20200410_0433"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="geohash",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=12
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issuesubtype",
+            name="name",
+            field=models.CharField(
+                max_length=200, unique=True, verbose_name="Issue Sub Type Name"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="issuetype",
+            name="name",
+            field=models.CharField(
+                max_length=200, unique=True, verbose_name="Issue Type Name"
+            ),
+        ),
+        migrations.RunPython(populate_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["geohash"], name="issue_geohash_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["owner", "geohash"], name="issue_owner_geohash_idx"
+            ),
+        ),
+    ]
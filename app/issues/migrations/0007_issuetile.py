@@ -0,0 +1,79 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:27
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import Substr
+
+
+def populate_tiles(apps, schema_editor):
+    Issue = apps.get_model("issues", "Issue")
+    IssueTile = apps.get_model("issues", "IssueTile")
+    for precision in range(1, 8):
+        rows = (
+            Issue.objects.exclude(geohash="")
+            .annotate(cell=Substr("geohash", 1, precision))
+            .values("cell", "status")
+            .annotate(
+                count=Count("id"),
+                latitude_sum=Sum("latitude"),
+                longitude_sum=Sum("longitude"),
+            )
+            .order_by()
+        )
+        IssueTile.objects.bulk_create(
+            IssueTile(
+                precision=precision,
+                cell=row["cell"],
+                status=row["status"],
+                count=row["count"],
+                latitude_sum=float(row["latitude_sum"]),
+                longitude_sum=float(row["longitude_sum"]),
+            )
+            for row in rows
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0006_issue_geohash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueTile",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("precision", models.PositiveSmallIntegerField()),
+                ("cell", models.CharField(max_length=12)),
+                (
+                    "status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("active", "Active"),
+                            ("pending", "Pending"),
+                            ("resolved", "Resolved"),
+                            ("fraud", "Fraud"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("latitude_sum", models.FloatField(default=0)),
+                ("longitude_sum", models.FloatField(default=0)),
+            ],
+            options={
+                "unique_together": {("precision", "cell", "status")},
+            },
+        ),
+        migrations.RunPython(populate_tiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0007_issuetile"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["owner", "status"], name="issue_owner_status_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0008_issue_owner_status_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="created_at",
+            field=models.DateTimeField(
+                auto_now_add=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["created_at", "id"], name="issue_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["owner", "created_at", "id"], name="issue_owner_created_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("issues", "0009_issue_created_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name="issue",
+            unique_together={("owner", "idempotency_key")},
+        ),
+    ]
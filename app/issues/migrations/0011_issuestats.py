@@ -0,0 +1,91 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:36
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Substr, TruncDate
+
+from app.common.helpers import bulk_batch_size
+
+
+def populate_stats(apps, schema_editor):
+    Issue = apps.get_model("issues", "Issue")
+    IssueStats = apps.get_model("issues", "IssueStats")
+    rows = (
+        Issue.objects.annotate(
+            day=TruncDate("created_at"), cell=Substr("geohash", 1, 4)
+        )
+        .values("day", "type_id", "status", "priority", "cell")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    IssueStats.objects.bulk_create(
+        (
+            IssueStats(
+                day=row["day"],
+                type=row["type_id"],
+                status=row["status"],
+                priority=row["priority"],
+                cell=row["cell"],
+                count=row["count"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=bulk_batch_size(IssueStats, 1000, schema_editor.connection.alias),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0010_issue_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueStats",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+                ("day", models.DateField()),
+                ("type", models.IntegerField(blank=True, null=True)),
+                (
+                    "status",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("active", "Active"),
+                            ("pending", "Pending"),
+                            ("resolved", "Resolved"),
+                            ("fraud", "Fraud"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "priority",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low"),
+                            ("medium", "Medium"),
+                            ("high", "High"),
+                            ("critical", "Critical"),
+                        ],
+                        max_length=100,
+                    ),
+                ),
+                ("cell", models.CharField(blank=True, max_length=4)),
+            ],
+            options={
+                "unique_together": {("day", "type", "status", "priority", "cell")},
+            },
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
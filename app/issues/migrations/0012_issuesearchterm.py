@@ -0,0 +1,79 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from app.common.helpers import bulk_batch_size
+from app.issues.search import term_weights
+
+
+def index_issues(apps, schema_editor):
+    Issue = apps.get_model("issues", "Issue")
+    IssueSearchTerm = apps.get_model("issues", "IssueSearchTerm")
+    IssueSearchTerm.objects.bulk_create(
+        (
+            IssueSearchTerm(issue_id=issue.pk, term=term, weight=weight)
+            for issue in Issue.objects.only("title", "description").iterator()
+            for term, weight in term_weights(issue.title, issue.description).items()
+        ),
+        batch_size=bulk_batch_size(
+            IssueSearchTerm, 1000, schema_editor.connection.alias
+        ),
+    )
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute(
+            "CREATE FULLTEXT INDEX issue_fulltext_idx "
+            "ON issues_issue (title, description)"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "mysql":
+        schema_editor.execute("DROP INDEX issue_fulltext_idx ON issues_issue")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0011_issuestats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=32)),
+                ("weight", models.PositiveIntegerField(default=1)),
+                (
+                    "issue",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="issues.Issue",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="issuesearchterm",
+            index=models.Index(fields=["term", "issue"], name="issue_search_term_idx"),
+        ),
+        migrations.AlterUniqueTogether(
+            name="issuesearchterm",
+            unique_together={("issue", "term")},
+        ),
+        migrations.RunPython(index_issues, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.0.7 on 2026-10-18 14:53
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+PRIORITY_RANKS = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+
+
+def populate_priority_rank(apps, schema_editor):
+    Issue = apps.get_model("issues", "Issue")
+    for priority, rank in PRIORITY_RANKS.items():
+        Issue.objects.filter(priority=priority).update(priority_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("issues", "0012_issuesearchterm"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="claimed_by",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="claimed_issues",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="lease_expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="priority_rank",
+            field=models.PositiveSmallIntegerField(default=2, editable=False),
+        ),
+        migrations.RunPython(populate_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["status", "priority_rank", "id"], name="issue_review_queue_idx"
+            ),
+        ),
+    ]
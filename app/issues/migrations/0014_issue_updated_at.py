@@ -0,0 +1,35 @@
+# Generated by Django 3.0.7 on 2026-10-18 15:10
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def populate_updated_at(apps, schema_editor):
+    Issue = apps.get_model("issues", "Issue")
+    Issue.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0013_issue_review_queue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(populate_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["owner", "updated_at"], name="issue_owner_updated_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.0.7 on 2026-10-18 16:02
+
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def spread_created_at(apps, schema_editor):
+    """
+    0009 stamped every existing issue with the same created_at, and cursor
+    pagination falls back to offsets within ties. Moves each row of a tie
+    back by a microsecond per later row, so the rows keep their id order.
+    """
+    Issue = apps.get_model("issues", "Issue")
+    ties = (
+        Issue.objects.values("created_at")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+        .values_list("created_at", flat=True)
+    )
+    for created_at in ties:
+        issues = list(
+            Issue.objects.filter(created_at=created_at).only("id").order_by("-id")
+        )
+        for offset, issue in enumerate(issues):
+            issue.created_at = created_at - timedelta(microseconds=offset)
+        Issue.objects.bulk_update(issues, ["created_at"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("issues", "0014_issue_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_created_at, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,13 @@
+import math
+from collections import defaultdict
+
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import ExpressionWrapper
+from django.db.models.functions import Cast, Cos, Power, Radians, Sin, Substr, TruncDate
+
+from app.common.geo import EARTH_RADIUS_KM, bounding_box, geohash_cover, geohash_encode
+from app.common.helpers import bulk_batch_size
 
 STATUS_CHOICES = (
     ("active", "Active"),
@@ -14,6 +22,8 @@ PRIORITY_LEVEL_CHOICES = (
     ("high", "High"),
     ("critical", "Critical"),
 )
+# Review order, most urgent first.
+PRIORITY_RANKS = {"critical": 0, "high": 1, "medium": 2, "low": 3}
 
 
 class OwnedModel(models.Model):
@@ -23,13 +33,62 @@ class OwnedModel(models.Model):
         abstract = True
 
 
+class LocationQuerySet(models.QuerySet):
+    def within_bbox(self, min_lat, min_lng, max_lat, max_lng):
+        cells = models.Q()
+        for prefix in geohash_cover(min_lat, min_lng, max_lat, max_lng):
+            cells |= models.Q(geohash__startswith=prefix)
+        return self.filter(
+            cells,
+            latitude__gte=min_lat,
+            latitude__lte=max_lat,
+            longitude__gte=min_lng,
+            longitude__lte=max_lng,
+        )
+
+    def near(self, latitude, longitude, radius_km):
+        """
+        Narrows on the bounding box, then keeps rows whose haversine distance
+        is within `radius_km`, comparing the haversine term `a` against its
+        value at the radius so the check runs in SQL.
+        """
+        lat = math.radians(float(latitude))
+        lng = math.radians(float(longitude))
+        row_lat = Radians(Cast("latitude", models.FloatField()))
+        row_lng = Radians(Cast("longitude", models.FloatField()))
+        haversine = ExpressionWrapper(
+            Power(Sin((row_lat - lat) / 2), 2)
+            + math.cos(lat) * Cos(row_lat) * Power(Sin((row_lng - lng) / 2), 2),
+            output_field=models.FloatField(),
+        )
+        limit = math.sin(min(radius_km / (2 * EARTH_RADIUS_KM), math.pi / 2)) ** 2
+        return (
+            self.within_bbox(*bounding_box(latitude, longitude, radius_km))
+            .annotate(haversine=haversine)
+            .filter(haversine__lte=limit)
+        )
+
+
 class LocationModel(models.Model):
     longitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False)
 
     class Meta:
         abstract = True
 
+    def set_geohash(self):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(self.latitude, self.longitude)
+
+    def save(self, *args, **kwargs):
+        self.set_geohash()
+        if self.geohash:
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "geohash" not in update_fields:
+                kwargs["update_fields"] = list(update_fields) + ["geohash"]
+        super().save(*args, **kwargs)
+
 
 class IssueType(models.Model):
     name = models.CharField(
@@ -76,3 +135,331 @@ class Issue(OwnedModel, LocationModel):
     reviewed_by = models.ForeignKey(
         User, related_name="reviewed_issues", on_delete=models.SET_NULL, null=True
     )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # The basis of the ETag and Last-Modified validators on /api/v1/issues/.
+    # auto_now only applies to save(), so queryset update() calls that change
+    # serialized fields must set it themselves (see app.issues.review).
+    updated_at = models.DateTimeField(auto_now=True)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
+    priority_rank = models.PositiveSmallIntegerField(
+        default=PRIORITY_RANKS["medium"], editable=False
+    )
+    claimed_by = models.ForeignKey(
+        User, related_name="claimed_issues", on_delete=models.SET_NULL, null=True
+    )
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+
+    objects = LocationQuerySet.as_manager()
+
+    # Fields the rollup tables (tiles, stats), the search index and the
+    # change events (app.issues.events) are derived from.
+    TRACKED_FIELDS = (
+        "title",
+        "description",
+        "status",
+        "reviewed_by_id",
+        "priority",
+        "type_id",
+        "geohash",
+        "latitude",
+        "longitude",
+        "created_at",
+    )
+
+    class Meta:
+        unique_together = [("owner", "idempotency_key")]
+        indexes = [
+            models.Index(fields=["geohash"], name="issue_geohash_idx"),
+            models.Index(fields=["owner", "geohash"], name="issue_owner_geohash_idx"),
+            models.Index(fields=["owner", "status"], name="issue_owner_status_idx"),
+            models.Index(fields=["created_at", "id"], name="issue_created_idx"),
+            models.Index(
+                fields=["owner", "created_at", "id"], name="issue_owner_created_idx"
+            ),
+            models.Index(
+                fields=["status", "priority_rank", "id"], name="issue_review_queue_idx"
+            ),
+            models.Index(
+                fields=["owner", "updated_at"], name="issue_owner_updated_idx"
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_tracked_values()
+        return instance
+
+    def remember_tracked_values(self):
+        deferred = self.get_deferred_fields()
+        self._tracked_values = {
+            name: getattr(self, name)
+            for name in self.TRACKED_FIELDS
+            if name not in deferred
+        }
+
+    def loaded_tracked_values(self):
+        """
+        Returns the tracked field values as last loaded from or saved to the
+        database, or None if they were not (fully) loaded.
+        """
+        values = getattr(self, "_tracked_values", {})
+        if len(values) != len(self.TRACKED_FIELDS):
+            return None
+        return values
+
+    def tracked_values(self):
+        return {name: getattr(self, name) for name in self.TRACKED_FIELDS}
+
+    def set_priority_rank(self):
+        self.priority_rank = PRIORITY_RANKS.get(self.priority, PRIORITY_RANKS["medium"])
+
+    def save(self, *args, **kwargs):
+        self.set_priority_rank()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields) | {"updated_at"}
+            if "priority" in update_fields:
+                update_fields.add("priority_rank")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
+
+
+class IssueSearchTerm(models.Model):
+    """
+    Inverted index entry: `term` occurs in the issue's title or description
+    with the given weight (see app.issues.search).
+    """
+
+    issue = models.ForeignKey(Issue, related_name="+", on_delete=models.CASCADE)
+    term = models.CharField(max_length=32)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        unique_together = [("issue", "term")]
+        indexes = [
+            models.Index(fields=["term", "issue"], name="issue_search_term_idx"),
+        ]
+
+
+class RollupModel(models.Model):
+    """
+    Counter table maintained incrementally from issue snapshots (dicts of
+    Issue.TRACKED_FIELDS).
+
+    Subclasses name their key columns in KEY_FIELDS and define a
+    `rollup_keys(snapshot)` classmethod yielding the (key, sums) pairs a
+    snapshot counts towards, where `sums` maps other float columns to the
+    snapshot's contribution.
+    """
+
+    KEY_FIELDS = ()
+
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def apply(cls, changes):
+        """
+        Applies a list of (snapshot, delta) pairs with a single UPDATE of
+        the affected rows, after looking up which of the rows gaining a
+        count exist when there are several. Missing rows are created.
+        Changes that cancel out, such as an update that left the key columns
+        alone, issue no query.
+        """
+        totals = defaultdict(lambda: defaultdict(float))
+        for snapshot, delta in changes:
+            for key, sums in cls.rollup_keys(snapshot):
+                total = totals[key]
+                total["count"] += delta
+                for name, value in sums.items():
+                    total[name] += float(value) * delta
+        increments = {}
+        for key, total in totals.items():
+            if any(total.values()):
+                total["count"] = int(total["count"])
+                increments[key] = dict(total)
+        # Only rows gaining a count can be missing: the others already
+        # count the snapshot being taken away.
+        added = [key for key, values in increments.items() if values["count"] > 0]
+        existing = set()
+        if len(added) > 1:
+            existing = set(
+                cls.objects.filter(cls._lookup(added)).values_list(*cls.KEY_FIELDS)
+            )
+        cls._increment(
+            {
+                key: values
+                for key, values in increments.items()
+                if key in existing or values["count"] <= 0
+            }
+        )
+        for key in added:
+            if key in existing or cls._increment({key: increments[key]}):
+                continue
+            lookup = dict(zip(cls.KEY_FIELDS, key))
+            try:
+                with transaction.atomic():
+                    cls.objects.create(**lookup, **increments[key])
+            except IntegrityError:
+                cls._increment({key: increments[key]})
+
+    @classmethod
+    def _lookup(cls, keys):
+        lookup = models.Q()
+        for key in keys:
+            lookup |= models.Q(**dict(zip(cls.KEY_FIELDS, key)))
+        return lookup
+
+    @classmethod
+    def _increment(cls, increments):
+        """
+        Adds `increments`, {key: {column: value}}, to the rows with those
+        keys in one UPDATE, with a CASE per column when they differ between
+        rows. Returns the number of rows updated.
+        """
+        if not increments:
+            return 0
+        # Rows getting the same increments share one WHEN.
+        groups = defaultdict(list)
+        for key, values in increments.items():
+            groups[tuple(sorted(values.items()))].append(key)
+        columns = {name for values in increments.values() for name in values}
+        updates = {}
+        for name in columns:
+            field = cls._meta.get_field(name)
+            if len(groups) == 1:
+                value = models.Value(dict(next(iter(groups)))[name])
+            else:
+                value = models.Case(
+                    *(
+                        models.When(cls._lookup(keys), then=dict(values).get(name, 0))
+                        for values, keys in groups.items()
+                    ),
+                    default=0,
+                    output_field=field,
+                )
+            updates[name] = models.F(name) + value
+        return cls.objects.filter(cls._lookup(increments)).update(**updates)
+
+
+TILE_PRECISIONS = range(1, 8)
+
+
+class IssueTile(RollupModel):
+    """
+    Per-zoom aggregate of issues in a geohash cell, one row per status.
+    """
+
+    KEY_FIELDS = ("precision", "cell", "status")
+
+    precision = models.PositiveSmallIntegerField()
+    cell = models.CharField(max_length=12)
+    status = models.CharField(choices=STATUS_CHOICES, max_length=100, blank=True)
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = [("precision", "cell", "status")]
+
+    @classmethod
+    def rollup_keys(cls, snapshot):
+        geohash = snapshot["geohash"]
+        if not geohash:
+            return
+        sums = {
+            "latitude_sum": snapshot["latitude"],
+            "longitude_sum": snapshot["longitude"],
+        }
+        for precision in TILE_PRECISIONS:
+            yield (precision, geohash[:precision], snapshot["status"]), sums
+
+    @classmethod
+    def rebuild(cls):
+        with transaction.atomic():
+            cls.objects.all().delete()
+            for precision in TILE_PRECISIONS:
+                rows = (
+                    Issue.objects.exclude(geohash="")
+                    .annotate(cell=Substr("geohash", 1, precision))
+                    .values("cell", "status")
+                    .annotate(
+                        count=models.Count("id"),
+                        latitude_sum=models.Sum("latitude"),
+                        longitude_sum=models.Sum("longitude"),
+                    )
+                    .order_by()
+                )
+                cls.objects.bulk_create(
+                    cls(
+                        precision=precision,
+                        cell=row["cell"],
+                        status=row["status"],
+                        count=row["count"],
+                        latitude_sum=float(row["latitude_sum"]),
+                        longitude_sum=float(row["longitude_sum"]),
+                    )
+                    for row in rows
+                )
+
+
+STATS_CELL_PRECISION = 4
+
+
+class IssueStats(RollupModel):
+    """
+    Daily issue counts per type, status, priority and region (a geohash
+    cell of STATS_CELL_PRECISION characters, roughly 40 x 20 km).
+    """
+
+    KEY_FIELDS = ("day", "type", "status", "priority", "cell")
+
+    day = models.DateField()
+    # Plain id rather than a foreign key, so deleting a type keeps its history.
+    type = models.IntegerField(null=True, blank=True)
+    status = models.CharField(choices=STATUS_CHOICES, max_length=100, blank=True)
+    priority = models.CharField(choices=PRIORITY_LEVEL_CHOICES, max_length=100)
+    cell = models.CharField(max_length=STATS_CELL_PRECISION, blank=True)
+
+    class Meta:
+        unique_together = [("day", "type", "status", "priority", "cell")]
+
+    @classmethod
+    def rollup_keys(cls, snapshot):
+        yield (
+            snapshot["created_at"].date(),
+            snapshot["type_id"],
+            snapshot["status"],
+            snapshot["priority"],
+            snapshot["geohash"][:STATS_CELL_PRECISION],
+        ), {}
+
+    @classmethod
+    def rebuild(cls):
+        with transaction.atomic():
+            cls.objects.all().delete()
+            rows = (
+                Issue.objects.annotate(
+                    day=TruncDate("created_at"),
+                    cell=Substr("geohash", 1, STATS_CELL_PRECISION),
+                )
+                .values("day", "type_id", "status", "priority", "cell")
+                .annotate(count=models.Count("id"))
+                .order_by()
+            )
+            cls.objects.bulk_create(
+                (
+                    cls(
+                        day=row["day"],
+                        type=row["type_id"],
+                        status=row["status"],
+                        priority=row["priority"],
+                        cell=row["cell"],
+                        count=row["count"],
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=bulk_batch_size(cls, 1000),
+            )
@@ -0,0 +1,114 @@
+"""
+Reviewer work queue over issues with status REVIEW_QUEUE_STATUS that nobody
+has reviewed, ordered by priority and then age.
+
+Claiming an issue leases it to a reviewer for REVIEW_LEASE_SECONDS; expired
+leases put the issue back in the queue, so abandoned claims are picked up
+by the next reviewer.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.timezone import now
+
+from app.issues.models import Issue
+
+# Candidates tried per claim where rows can't be locked (SQLite).
+CLAIM_ATTEMPTS = 5
+
+
+def queue(current_time):
+    return (
+        Issue.objects.filter(
+            status=settings.REVIEW_QUEUE_STATUS, reviewed_by__isnull=True
+        )
+        .filter(
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=current_time)
+        )
+        .order_by("priority_rank", "id")
+    )
+
+
+def active_claim(reviewer, current_time):
+    return Issue.objects.filter(
+        claimed_by=reviewer,
+        lease_expires_at__gt=current_time,
+        reviewed_by__isnull=True,
+    ).first()
+
+
+def claim_next(reviewer):
+    """
+    Leases the most urgent unclaimed issue to `reviewer` and returns it, or
+    returns the reviewer's current claim if they still hold one. Returns
+    None when the queue is empty.
+    """
+    current_time = now()
+    claim = {
+        "claimed_by": reviewer,
+        "lease_expires_at": current_time
+        + timedelta(seconds=settings.REVIEW_LEASE_SECONDS),
+        "updated_at": current_time,
+    }
+    with transaction.atomic():
+        issue = active_claim(reviewer, current_time)
+        if issue is not None:
+            return issue
+        candidates = queue(current_time)
+        if connection.features.has_select_for_update_skip_locked:
+            # Concurrent reviewers skip rows another transaction is claiming
+            # instead of waiting on them.
+            issue = candidates.select_for_update(skip_locked=True).first()
+            if issue is None:
+                return None
+            Issue.objects.filter(pk=issue.pk).update(**claim)
+        else:
+            # The conditional update only succeeds for one of several
+            # reviewers that read the same candidate.
+            for pk in candidates.values_list("pk", flat=True)[:CLAIM_ATTEMPTS]:
+                if candidates.filter(pk=pk).update(**claim):
+                    issue = Issue.objects.get(pk=pk)
+                    break
+            else:
+                return None
+    for name, value in claim.items():
+        setattr(issue, name, value)
+    return issue
+
+
+def complete(reviewer, pk, status):
+    """
+    Records the review of an issue claimed by `reviewer`. Returns the issue,
+    or None if the reviewer does not hold the claim.
+    """
+    with transaction.atomic():
+        issue = (
+            Issue.objects.select_for_update()
+            .filter(pk=pk, claimed_by=reviewer, reviewed_by__isnull=True)
+            .first()
+        )
+        if issue is None:
+            return None
+        issue.status = status
+        issue.reviewed_by = reviewer
+        issue.claimed_by = None
+        issue.lease_expires_at = None
+        # A regular save, so rollups and the search index see the new status.
+        issue.save(
+            update_fields=["status", "reviewed_by", "claimed_by", "lease_expires_at"]
+        )
+    return issue
+
+
+def release(reviewer, pk):
+    """
+    Returns an issue claimed by `reviewer` to the queue.
+    """
+    return bool(
+        Issue.objects.filter(
+            pk=pk, claimed_by=reviewer, reviewed_by__isnull=True
+        ).update(claimed_by=None, lease_expires_at=None, updated_at=now())
+    )
@@ -0,0 +1,110 @@
+"""
+Full-text search over issue titles and descriptions.
+
+The backend is chosen with the ISSUE_SEARCH_BACKEND setting:
+InvertedIndexBackend keeps an IssueSearchTerm table up to date on save and
+works on any database, MySQLFulltextBackend uses the FULLTEXT index created
+by the migrations on MySQL.
+"""
+
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db.models import OuterRef, Q, Subquery, Sum
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from app.common.helpers import bulk_batch_size
+from app.issues.models import IssueSearchTerm
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+MAX_TERM_LENGTH = 32
+MAX_QUERY_TERMS = 8
+TITLE_WEIGHT = 3
+STOP_WORDS = frozenset(
+    "a an and are as at be but by for from has have in is it of on or that "
+    "the this to was were will with".split()
+)
+
+
+def tokenize(text):
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall((text or "").lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def term_weights(title, description):
+    weights = Counter()
+    for term in tokenize(title):
+        weights[term] += TITLE_WEIGHT
+    for term in tokenize(description):
+        weights[term] += 1
+    return weights
+
+
+class InvertedIndexBackend:
+    def index(self, issues):
+        IssueSearchTerm.objects.filter(issue__in=issues).delete()
+        IssueSearchTerm.objects.bulk_create(
+            (
+                IssueSearchTerm(issue_id=issue.pk, term=term, weight=weight)
+                for issue in issues
+                for term, weight in term_weights(issue.title, issue.description).items()
+            ),
+            batch_size=bulk_batch_size(IssueSearchTerm, 1000),
+        )
+
+    def search(self, queryset, query):
+        """
+        Returns issues containing every query term as a prefix of one of
+        their terms, ranked by the summed weight of the matching terms.
+        """
+        terms = tokenize(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return queryset.none()
+        matching = Q()
+        for term in terms:
+            queryset = queryset.filter(
+                pk__in=IssueSearchTerm.objects.filter(term__startswith=term).values(
+                    "issue_id"
+                )
+            )
+            matching |= Q(term__startswith=term)
+        rank = (
+            IssueSearchTerm.objects.filter(matching, issue_id=OuterRef("pk"))
+            .values("issue_id")
+            .annotate(rank=Sum("weight"))
+            .values("rank")
+        )
+        return queryset.annotate(search_rank=Subquery(rank)).order_by(
+            "-search_rank", "-id"
+        )
+
+
+class MySQLFulltextBackend:
+    def index(self, issues):
+        # MySQL maintains the FULLTEXT index itself.
+        pass
+
+    def search(self, queryset, query):
+        terms = tokenize(query)[:MAX_QUERY_TERMS]
+        if not terms:
+            return queryset.none()
+        boolean_query = " ".join(f"+{term}*" for term in terms)
+        match = RawSQL(
+            "MATCH (issues_issue.title, issues_issue.description) "
+            "AGAINST (%s IN BOOLEAN MODE)",
+            [boolean_query],
+        )
+        return (
+            queryset.annotate(search_rank=match)
+            .filter(search_rank__gt=0)
+            .order_by("-search_rank", "-id")
+        )
+
+
+def get_search_backend():
+    return import_string(settings.ISSUE_SEARCH_BACKEND)()
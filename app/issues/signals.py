@@ -0,0 +1,103 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from app.issues import events, taxonomy
+from app.issues.models import Issue, IssueStats, IssueSubType, IssueTile, IssueType
+from app.issues.search import get_search_backend
+
+# Tables maintained incrementally from issue changes.
+ROLLUPS = (IssueTile, IssueStats)
+
+# Sent with `issues` after Issue.objects.bulk_create(), which skips the
+# model save signals.
+issues_bulk_created = Signal()
+
+
+@receiver(pre_save, sender=Issue)
+def capture_previous_values(sender, instance, raw, **kwargs):
+    instance._previous_values = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    previous = instance.loaded_tracked_values()
+    if previous is None:
+        previous = (
+            Issue.objects.filter(pk=instance.pk).values(*Issue.TRACKED_FIELDS).first()
+        )
+    instance._previous_values = previous
+
+
+def apply_rollups(changes):
+    for rollup in ROLLUPS:
+        rollup.apply(changes)
+
+
+@receiver(post_save, sender=Issue)
+def update_rollups_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = instance._previous_values
+    current = instance.tracked_values()
+    if previous != current:
+        changes = [(current, 1)]
+        if previous:
+            changes.append((previous, -1))
+        apply_rollups(changes)
+    instance.remember_tracked_values()
+
+
+@receiver(issues_bulk_created)
+def update_rollups_on_bulk_create(sender, issues, **kwargs):
+    apply_rollups([(issue.tracked_values(), 1) for issue in issues])
+    for issue in issues:
+        issue.remember_tracked_values()
+
+
+@receiver(post_save, sender=Issue)
+def update_search_index_on_save(sender, instance, created, raw, **kwargs):
+    previous = instance._previous_values
+    if (
+        created
+        or raw
+        or previous is None
+        or previous["title"] != instance.title
+        or previous["description"] != instance.description
+    ):
+        get_search_backend().index([instance])
+
+
+@receiver(issues_bulk_created)
+def update_search_index_on_bulk_create(sender, issues, **kwargs):
+    get_search_backend().index(issues)
+
+
+@receiver(post_save, sender=Issue)
+def publish_event_on_save(sender, instance, created, raw, **kwargs):
+    previous = instance._previous_values
+    if created or raw or previous is None:
+        return
+    if (
+        previous["status"] != instance.status
+        or previous["reviewed_by_id"] != instance.reviewed_by_id
+    ):
+        transaction.on_commit(
+            partial(events.publish, instance.owner_id, events.issue_event(instance))
+        )
+
+
+@receiver(post_delete, sender=Issue)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    previous = instance.loaded_tracked_values() or instance.tracked_values()
+    apply_rollups([(previous, -1)])
+
+
+@receiver(post_save, sender=IssueType)
+@receiver(post_delete, sender=IssueType)
+@receiver(post_save, sender=IssueSubType)
+@receiver(post_delete, sender=IssueSubType)
+def invalidate_taxonomy(sender, **kwargs):
+    # After commit, so a concurrent read cannot cache the old rows under the
+    # new version.
+    transaction.on_commit(taxonomy.invalidate)
@@ -0,0 +1,76 @@
+"""
+Versioned cache of the issue type / sub-type taxonomy.
+
+The serialized taxonomy is stored in the shared cache under a key that
+includes the current version, and mirrored in-process so steady-state reads
+cost a single cache lookup of the version. Any change to an IssueType or
+IssueSubType bumps the version (see app.issues.signals).
+"""
+
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from app.common import db_router
+
+VERSION_KEY = "issues:taxonomy:version"
+PAYLOAD_KEY = "issues:taxonomy:{}"
+
+_local = {"version": None, "payload": None}
+_lock = threading.Lock()
+
+
+def _build_payload(version):
+    from app.api.serializers import IssueSubTypeSerializer, IssueTypeSerializer
+    from app.issues.models import IssueSubType, IssueType
+
+    # Read from a replica unless the change that bumped the version may not
+    # have reached it yet, as the payload is cached until the next change.
+    if time.time() - version[1] > settings.DATABASE_REPLICA_STICKY_SECONDS:
+        pinned = db_router.use_replica()
+    else:
+        pinned = db_router.use_primary()
+    with pinned:
+        types = IssueType.objects.prefetch_related("child_issue_type").order_by("id")
+        sub_types = IssueSubType.objects.order_by("id")
+        return {
+            "types": IssueTypeSerializer(types, many=True).data,
+            "sub_types": IssueSubTypeSerializer(sub_types, many=True).data,
+        }
+
+
+def current_version():
+    """
+    Returns the (etag, last_modified) pair identifying the cached taxonomy.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = (uuid.uuid4().hex, int(time.time()))
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY, version)
+    return version
+
+
+def invalidate():
+    cache.set(VERSION_KEY, (uuid.uuid4().hex, int(time.time())), None)
+
+
+def get_taxonomy():
+    """
+    Returns (version, payload) where payload holds the serialized "types"
+    and "sub_types" lists.
+    """
+    version = current_version()
+    if _local["version"] == version:
+        return version, _local["payload"]
+    payload = cache.get(PAYLOAD_KEY.format(version[0]))
+    if payload is None:
+        payload = _build_payload(version)
+        cache.set(PAYLOAD_KEY.format(version[0]), payload, None)
+    with _lock:
+        _local["version"] = version
+        _local["payload"] = payload
+    return version, payload
@@ -1,3 +1,274 @@
-from django.test import TestCase
+import asyncio
+import sys
+import types
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils.timezone import now
+
+from app.issues import events, review
+from app.issues.models import Issue, IssueStats, IssueTile, IssueType
+from app.issues.search import InvertedIndexBackend, tokenize
+from app.issues.signals import apply_rollups
+
+
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner@example.com", password="secret")
+        cls.type = IssueType.objects.create(name="Water")
+
+    def create_issue(self, latitude, longitude, status=""):
+        return Issue.objects.create(
+            owner=self.user,
+            title="Leak",
+            description="Pipe burst",
+            type=self.type,
+            latitude=latitude,
+            longitude=longitude,
+            status=status,
+        )
+
+    def rollups(self):
+        return [
+            sorted(
+                model.objects.filter(count__gt=0).values_list(
+                    *model.KEY_FIELDS, "count"
+                )
+            )
+            for model in (IssueTile, IssueStats)
+        ]
+
+    def test_incremental_rollups_match_rebuild(self):
+        issues = [
+            self.create_issue("12.971599", "77.594566"),
+            self.create_issue("12.971600", "77.594500", "active"),
+            self.create_issue("28.613939", "77.209023", "active"),
+        ]
+        issues[0].status = "resolved"
+        issues[0].save()
+        issues[1].latitude = "19.076090"
+        issues[1].longitude = "72.877426"
+        issues[1].save()
+        issues[2].delete()
+
+        incremental = self.rollups()
+        IssueTile.rebuild()
+        IssueStats.rebuild()
+        self.assertEqual(incremental, self.rollups())
+
+    def test_one_update_per_rollup(self):
+        issue = self.create_issue("12.971599", "77.594566")
+        # Taking the issue away touches seven tiles and a stats row, which
+        # all exist, so each table takes one UPDATE.
+        with self.assertNumQueries(2):
+            apply_rollups([(issue.tracked_values(), -1)])
+        self.assertEqual(self.rollups(), [[], []])
+
+
+class InvertedIndexSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("owner@example.com", password="secret")
+
+    def create_issue(self, title, description):
+        return Issue.objects.create(
+            owner=self.user,
+            title=title,
+            description=description,
+            latitude="12.971599",
+            longitude="77.594566",
+        )
+
+    def search(self, query):
+        queryset = InvertedIndexBackend().search(Issue.objects.all(), query)
+        return list(queryset.values_list("title", flat=True))
+
+    def test_tokenize(self):
+        self.assertEqual(
+            tokenize("The pipe is BURST, a 2m leak!"), ["pipe", "burst", "2m", "leak"]
+        )
+
+    def test_ranks_title_matches_first(self):
+        self.create_issue("Garbage", "Bins overflowing near the water tank")
+        self.create_issue("Water leak", "Pipe burst")
+        self.create_issue("Power cut", "No electricity")
+        self.assertEqual(self.search("water"), ["Water leak", "Garbage"])
+
+    def test_every_term_must_match_a_prefix(self):
+        self.create_issue("Water leak", "Pipe burst")
+        self.create_issue("Water shortage", "No supply")
+        self.assertEqual(self.search("wat lea"), ["Water leak"])
+        self.assertEqual(self.search("the"), [])
+
+    def test_index_follows_edits(self):
+        issue = self.create_issue("Water leak", "Pipe burst")
+        issue.title = "Sewage overflow"
+        issue.save()
+        self.assertEqual(self.search("water"), [])
+        self.assertEqual(self.search("sewage"), ["Sewage overflow"])
+
+
+class ReviewQueueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner@example.com", password="secret")
+        cls.reviewers = [
+            User.objects.create_user(f"reviewer{index}@example.com")
+            for index in range(3)
+        ]
+
+    def setUp(self):
+        self.issues = [
+            Issue.objects.create(
+                owner=self.owner,
+                title="Leak",
+                description="Pipe burst",
+                latitude="12.971599",
+                longitude="77.594566",
+                status="pending",
+                priority=priority,
+            )
+            for priority in ("low", "critical", "medium")
+        ]
+        Issue.objects.create(
+            owner=self.owner,
+            title="Leak",
+            description="Pipe burst",
+            latitude="12.971599",
+            longitude="77.594566",
+            status="active",
+            priority="critical",
+        )
+
+    def claim_all(self):
+        return [review.claim_next(reviewer) for reviewer in self.reviewers]
+
+    def test_claims_most_urgent_first(self):
+        expected = [self.issues[1], self.issues[2], self.issues[0]]
+        for skip_locked in (True, False):
+            with self.subTest(skip_locked=skip_locked), mock.patch.object(
+                connection.features, "has_select_for_update_skip_locked", skip_locked
+            ):
+                Issue.objects.update(claimed_by=None, lease_expires_at=None)
+                self.assertEqual(self.claim_all(), expected)
+                self.assertIsNone(review.claim_next(self.owner))
+
+    def test_reviewer_keeps_their_claim(self):
+        issue = review.claim_next(self.reviewers[0])
+        self.assertEqual(review.claim_next(self.reviewers[0]), issue)
+        self.assertEqual(Issue.objects.get(pk=issue.pk).claimed_by, self.reviewers[0])
+
+    def test_expired_lease_returns_to_queue(self):
+        issue = review.claim_next(self.reviewers[0])
+        Issue.objects.filter(pk=issue.pk).update(
+            lease_expires_at=now() - timedelta(seconds=1)
+        )
+        self.assertEqual(review.claim_next(self.reviewers[1]), issue)
+
+    def test_complete_and_release_need_the_claim(self):
+        issue = review.claim_next(self.reviewers[0])
+        self.assertIsNone(review.complete(self.reviewers[1], issue.pk, "resolved"))
+        self.assertFalse(review.release(self.reviewers[1], issue.pk))
+
+        self.assertTrue(review.release(self.reviewers[0], issue.pk))
+        issue = review.claim_next(self.reviewers[1])
+        completed = review.complete(self.reviewers[1], issue.pk, "resolved")
+        self.assertEqual(
+            (completed.status, completed.reviewed_by, completed.claimed_by),
+            ("resolved", self.reviewers[1], None),
+        )
+        self.assertNotIn(issue, review.queue(now()))
+
+    def test_claims_and_releases_touch_updated_at(self):
+        # Queryset updates skip auto_now, which the issue list validators
+        # depend on.
+        stale = now() - timedelta(hours=1)
+        Issue.objects.update(updated_at=stale)
+        issue = review.claim_next(self.reviewers[0])
+        self.assertGreater(Issue.objects.get(pk=issue.pk).updated_at, stale)
+
+        Issue.objects.update(updated_at=stale)
+        review.release(self.reviewers[0], issue.pk)
+        self.assertGreater(Issue.objects.get(pk=issue.pk).updated_at, stale)
+
+
+@override_settings(ISSUE_EVENTS_BACKEND="app.issues.events.InMemoryBackend")
+class EventStreamTests(SimpleTestCase):
+    def test_stream_delivers_owner_events(self):
+        async def read():
+            stream = events.owner_events(1)
+            lines = [await stream.__anext__()]
+            events.publish(2, {"id": 20})
+            events.publish(1, {"id": 10, "status": "resolved"})
+            lines.append(await stream.__anext__())
+            with mock.patch.object(events, "KEEPALIVE_SECONDS", 0):
+                lines.append(await stream.__anext__())
+            await stream.aclose()
+            return lines
+
+        lines = asyncio.run(read())
+        self.assertEqual(
+            lines,
+            [
+                b"retry: 5000\n\n",
+                b'event: issue\ndata: {"id": 10, "status": "resolved"}\n\n',
+                b": keepalive\n\n",
+            ],
+        )
+        # Closing the stream unsubscribes it.
+        self.assertEqual(dict(events.hub._subscribers), {})
+
+
+class RedisError(Exception):
+    pass
+
+
+@override_settings(ISSUE_EVENTS_REDIS_URL="redis://localhost")
+class RedisBackendTests(SimpleTestCase):
+    def setUp(self):
+        redis = types.ModuleType("redis")
+        redis.RedisError = RedisError
+        redis.Redis = mock.Mock()
+        patcher = mock.patch.dict(sys.modules, {"redis": redis})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.hub = mock.Mock()
+        self.backend = events.RedisBackend(self.hub)
+        self.client = self.backend.client
+
+    def test_publish_failure_is_logged(self):
+        self.client.publish.side_effect = RedisError("connection refused")
+        with self.assertLogs("app.issues.events", "ERROR"):
+            self.backend.publish("issues:owner:1", {"id": 1})
+
+    def test_listener_resubscribes_with_backoff(self):
+        unreachable = mock.Mock()
+        unreachable.psubscribe.side_effect = RedisError("connection refused")
+
+        def listen():
+            yield {"channel": b"cvc19:issues:owner:7", "data": b'{"id": 1}'}
+            raise RedisError("connection reset")
+
+        connected = mock.Mock()
+        connected.listen.side_effect = listen
+        self.client.pubsub.side_effect = [unreachable, unreachable, connected]
+
+        class Stop(Exception):
+            pass
+
+        with mock.patch.object(
+            events.time, "sleep", side_effect=[None, None, Stop]
+        ) as sleep, self.assertLogs("app.issues.events", "WARNING"):
+            with self.assertRaises(Stop):
+                self.backend.listen()
+
+        self.assertEqual(
+            sleep.call_args_list, [mock.call(0.5), mock.call(1.0), mock.call(0.5)]
+        )
+        self.hub.dispatch.assert_called_once_with("issues:owner:7", {"id": 1})
+        self.assertEqual(unreachable.close.call_count, 2)
+        connected.close.assert_called_once_with()
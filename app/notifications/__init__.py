@@ -0,0 +1 @@
+default_app_config = "app.notifications.apps.NotificationsConfig"
@@ -0,0 +1,69 @@
+import smtplib
+from itertools import groupby
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from app.common.instrumentation import track_outbound
+from app.notifications import outbox
+from app.notifications.models import OutboundEmail
+
+
+class EmailDeliveryError(Exception):
+    pass
+
+
+def enqueue_email(recipient, subject, body, html_body=""):
+    return OutboundEmail.objects.create(
+        recipient=recipient, subject=subject, body=body, html_body=html_body
+    )
+
+
+def claim_batch(batch_size):
+    return outbox.claim_batch(OutboundEmail, batch_size)
+
+
+def _content(message):
+    return message.subject, message.body, message.html_body
+
+
+def _build(message, connection):
+    email = EmailMultiAlternatives(
+        message.subject, message.body, to=[message.recipient], connection=connection
+    )
+    if message.html_body:
+        email.attach_alternative(message.html_body, "text/html")
+    return email
+
+
+def deliver(messages, connection=None):
+    """
+    Sends claimed messages over a single backend connection opened once for
+    the whole batch. Messages with identical content are handed to the
+    backend together, so batching backends can send them in one API call.
+    Returns the number of messages sent.
+    """
+    errors = (smtplib.SMTPException, OSError, EmailDeliveryError)
+    connection = connection or get_connection()
+    try:
+        connection.open()
+    except errors as e:
+        outbox.mark_failed(messages, str(e))
+        return 0
+    sent = 0
+    try:
+        messages = sorted(messages, key=_content)
+        for content, group in groupby(messages, key=_content):
+            group = list(group)
+            try:
+                with track_outbound("email"):
+                    connection.send_messages(
+                        [_build(message, connection) for message in group]
+                    )
+            except errors as e:
+                outbox.mark_failed(group, str(e))
+            else:
+                outbox.mark_sent(OutboundEmail, group)
+                sent += len(group)
+    finally:
+        connection.close()
+    return sent
@@ -0,0 +1,30 @@
+"""
+Mailgun HTTP API client for the async request path, where the blocking SMTP
+backend cannot be used without tying up a thread.
+"""
+
+from django.conf import settings
+
+from app.common.http import get_async_client
+from app.common.instrumentation import track_outbound
+
+
+class MailgunError(Exception):
+    pass
+
+
+async def send_mail_async(subject, message, recipient_list, from_email=None):
+    with track_outbound("mailgun"):
+        response = await get_async_client().post(
+            f"{settings.MAILGUN_API_URL}/messages",
+            auth=("api", settings.MAILGUN_API_KEY or ""),
+            data={
+                "from": from_email or settings.DEFAULT_FROM_EMAIL,
+                "to": recipient_list,
+                "subject": subject,
+                "text": message,
+            },
+        )
+    if response.status_code != 200:
+        raise MailgunError(f"HTTP {response.status_code}: {response.text[:200]}")
+    return response.json()
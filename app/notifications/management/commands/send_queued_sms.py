@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.notifications.sms import claim_batch, deliver
+
+
+class Command(BaseCommand):
+    help = "Sends queued outbound SMS in batches, retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep polling the queue."
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to sleep when the queue is empty (with --loop).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            messages = claim_batch(options["batch_size"])
+            if messages:
+                sent = deliver(messages)
+                self.stdout.write(f"Sent {sent} of {len(messages)} messages")
+            if not options["loop"]:
+                break
+            if not messages:
+                time.sleep(options["interval"])
@@ -0,0 +1,51 @@
+from django.db import models
+from django.utils.timezone import now
+
+MESSAGE_STATUS_CHOICES = (
+    ("queued", "Queued"),
+    ("sent", "Sent"),
+    ("failed", "Failed"),
+)
+
+
+class OutboundSMS(models.Model):
+    phone = models.CharField(verbose_name="Recipient Phone Number", max_length=12)
+    message = models.TextField()
+    status = models.CharField(
+        choices=MESSAGE_STATUS_CHOICES, default="queued", max_length=10
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="sms_status_next_attempt_idx"
+            ),
+        ]
+
+
+class OutboundEmail(models.Model):
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default="")
+    status = models.CharField(
+        choices=MESSAGE_STATUS_CHOICES, default="queued", max_length=10
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"],
+                name="email_status_next_attempt_idx",
+            ),
+        ]
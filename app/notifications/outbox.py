@@ -0,0 +1,59 @@
+"""
+Claiming and retry bookkeeping shared by the outbound SMS and email queues.
+"""
+
+import random
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 15 * 60
+# How long a claimed message stays invisible to other workers.
+CLAIM_SECONDS = 60
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+
+def claim_batch(model, batch_size):
+    """
+    Claims up to `batch_size` due messages by pushing their next attempt past
+    the claim window, so concurrent workers skip them.
+    """
+    current_time = now()
+    with transaction.atomic():
+        due = model.objects.filter(
+            status="queued", next_attempt_at__lte=current_time
+        ).order_by("next_attempt_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        messages = list(due[:batch_size])
+        for message in messages:
+            message.attempts += 1
+        model.objects.filter(pk__in=[message.pk for message in messages]).update(
+            attempts=F("attempts") + 1,
+            next_attempt_at=current_time + timedelta(seconds=CLAIM_SECONDS),
+        )
+    return messages
+
+
+def mark_sent(model, messages):
+    model.objects.filter(pk__in=[message.pk for message in messages]).update(
+        status="sent", sent_at=now()
+    )
+
+
+def mark_failed(messages, error):
+    for message in messages:
+        message.last_error = error[:1000]
+        if message.attempts >= MAX_ATTEMPTS:
+            message.status = "failed"
+        else:
+            message.next_attempt_at = now() + retry_delay(message.attempts)
+        message.save(update_fields=["status", "next_attempt_at", "last_error"])
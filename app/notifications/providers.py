@@ -0,0 +1,289 @@
+"""
+SMS providers and the failover gateway used by the outbound SMS worker.
+
+Providers are configured with the SMS_PROVIDERS setting, a list of dotted
+paths tried in order of observed latency. Each provider sits behind a
+circuit breaker so a failing gateway is skipped until it has had time to
+recover.
+
+Providers report failures per number: `send()` returns the numbers that
+could not be sent and raises SMSProviderError only when the whole call
+failed, so the gateway retries just those numbers on the next provider.
+ASGI coroutines use `send_async()`, which goes through the same providers
+and circuit breakers without blocking the event loop.
+"""
+
+import os
+import threading
+import time
+from itertools import groupby
+from operator import itemgetter
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from app.api import textlocal
+from app.common.instrumentation import track_outbound
+
+
+class SMSProviderError(Exception):
+    pass
+
+
+class SMSProvider:
+    name = None
+
+    def send(self, numbers, message):
+        """
+        Returns a dict of the numbers that failed to their error.
+        """
+        raise NotImplementedError
+
+    def send_many(self, messages):
+        """
+        Sends a list of (number, message) pairs, by default with one send()
+        per distinct message. Returns a dict of the pairs that failed to
+        their error.
+        """
+        failed = {}
+        messages = sorted(messages, key=itemgetter(1))
+        for message, group in groupby(messages, key=itemgetter(1)):
+            numbers = [number for number, _ in group]
+            try:
+                errors = self.send(numbers, message)
+            except SMSProviderError as e:
+                errors = dict.fromkeys(numbers, str(e))
+            failed.update(((number, message), e) for number, e in errors.items())
+        return failed
+
+    async def send_async(self, numbers, message):
+        """
+        Non-blocking send(), by default run in a worker thread.
+        """
+        return await sync_to_async(self.send, thread_sensitive=False)(numbers, message)
+
+
+class TextlocalProvider(SMSProvider):
+    name = "textlocal"
+
+    def send(self, numbers, message):
+        try:
+            textlocal.send_sms(numbers, message)
+        except (textlocal.TextlocalError, OSError) as e:
+            raise SMSProviderError(f"textlocal: {e}") from e
+        return {}
+
+    def send_many(self, messages):
+        try:
+            rejected = textlocal.send_bulk_sms(messages)
+        except (textlocal.TextlocalError, OSError) as e:
+            raise SMSProviderError(f"textlocal: {e}") from e
+        return {
+            (number, message): f"textlocal: {rejected[number]}"
+            for number, message in messages
+            if number in rejected
+        }
+
+    async def send_async(self, numbers, message):
+        try:
+            await textlocal.send_sms_async(numbers, message)
+        except (textlocal.TextlocalError, httpx.HTTPError) as e:
+            raise SMSProviderError(f"textlocal: {e}") from e
+        return {}
+
+
+class TwilioProvider(SMSProvider):
+    name = "twilio"
+
+    def __init__(self):
+        from twilio.http.http_client import TwilioHttpClient
+        from twilio.rest import Client
+
+        self.from_number = os.getenv("TWILIO_FROM_NUMBER")
+        self.client = Client(
+            os.getenv("TWILIO_ACCOUNT_SID"),
+            os.getenv("TWILIO_AUTH_TOKEN"),
+            http_client=TwilioHttpClient(pool_connections=True, timeout=10),
+        )
+
+    def send(self, numbers, message):
+        from twilio.base.exceptions import TwilioException
+
+        failed = {}
+        for number in numbers:
+            try:
+                with track_outbound("twilio"):
+                    self.client.messages.create(
+                        to=f"+{number}", from_=self.from_number, body=message
+                    )
+            except (TwilioException, OSError) as e:
+                failed[number] = f"twilio: {e}"
+        return failed
+
+
+class FakeProvider(SMSProvider):
+    """
+    Records messages in memory instead of sending them. Set `fail` to make
+    every send raise.
+    """
+
+    name = "fake"
+    outbox = []
+    fail = False
+
+    def send(self, numbers, message):
+        if self.fail:
+            raise SMSProviderError("fake: forced failure")
+        self.outbox.append((list(numbers), message))
+        return {}
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Returns False while open. Once `reset_timeout` has passed calls are
+        let through again (half-open) and the next failure reopens it.
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
+class FailoverGateway:
+    # Weight of the newest sample in the moving latency average.
+    latency_smoothing = 0.2
+    # Latency charged for a failed call, so failing providers sort last.
+    failure_penalty = 5.0
+
+    def __init__(self, providers):
+        self.providers = list(providers)
+        self.breakers = {p.name: CircuitBreaker() for p in self.providers}
+        self.latency = {p.name: 0.0 for p in self.providers}
+
+    def ordered_providers(self):
+        available = [p for p in self.providers if self.breakers[p.name].allow()]
+        return sorted(
+            available,
+            key=lambda p: (self.latency[p.name], self.providers.index(p)),
+        )
+
+    def send(self, numbers, message):
+        """
+        Raises SMSProviderError unless every number was sent.
+        """
+        failed = self.send_many([(number, message) for number in numbers])
+        if failed:
+            raise SMSProviderError("; ".join(dict.fromkeys(failed.values())))
+
+    async def send_async(self, numbers, message):
+        """
+        Non-blocking send() for use from ASGI coroutines.
+        """
+        pending = list(dict.fromkeys(numbers))
+        errors = {number: [] for number in pending}
+        for provider in self.ordered_providers():
+            started = time.monotonic()
+            try:
+                failed = await provider.send_async(pending, message)
+            except SMSProviderError as e:
+                failed = dict.fromkeys(pending, str(e))
+            pending = self._record_result(provider, started, pending, failed, errors)
+            if not pending:
+                return
+        raise SMSProviderError(
+            "; ".join(dict.fromkeys(self._join_errors(errors, pending).values()))
+        )
+
+    def send_many(self, messages):
+        """
+        Sends (number, message) pairs, handing the ones a provider could not
+        send to the next. Returns a dict of the pairs no provider could send
+        to their errors.
+        """
+        pending = list(dict.fromkeys(messages))
+        errors = {pair: [] for pair in pending}
+        for provider in self.ordered_providers():
+            started = time.monotonic()
+            try:
+                failed = provider.send_many(pending)
+            except SMSProviderError as e:
+                failed = dict.fromkeys(pending, str(e))
+            pending = self._record_result(provider, started, pending, failed, errors)
+            if not pending:
+                return {}
+        return self._join_errors(errors, pending)
+
+    def _record_result(self, provider, started, pending, failed, errors):
+        """
+        Updates the provider's latency and breaker from a send of `pending`
+        that failed for the keys of `failed`, which it returns as a list.
+        """
+        breaker = self.breakers[provider.name]
+        if len(failed) == len(pending):
+            self._record_latency(
+                provider, max(time.monotonic() - started, self.failure_penalty)
+            )
+            breaker.record_failure()
+        else:
+            self._record_latency(provider, time.monotonic() - started)
+            breaker.record_success()
+        for key, error in failed.items():
+            errors[key].append(error)
+        return [key for key in pending if key in failed]
+
+    @staticmethod
+    def _join_errors(errors, pending):
+        return {
+            key: "; ".join(errors[key]) or "no SMS provider available"
+            for key in pending
+        }
+
+    def _record_latency(self, provider, elapsed):
+        previous = self.latency[provider.name]
+        if previous:
+            elapsed = previous + self.latency_smoothing * (elapsed - previous)
+        self.latency[provider.name] = elapsed
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = FailoverGateway(
+                import_string(path)() for path in settings.SMS_PROVIDERS
+            )
+        return _gateway
+
+
+@receiver(setting_changed)
+def reset_gateway(setting, **kwargs):
+    global _gateway
+    if setting == "SMS_PROVIDERS":
+        _gateway = None
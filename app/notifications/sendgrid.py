@@ -0,0 +1,85 @@
+"""
+Django email backend for the SendGrid v3 API, enabled by setting
+SENDGRID_API_KEY.
+"""
+
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail.backends.base import BaseEmailBackend
+from python_http_client.exceptions import HTTPError
+from sendgrid import SendGridAPIClient
+from sendgrid.helpers.mail import Mail, Personalization, To
+
+from app.common.instrumentation import track_outbound
+from app.notifications.mail import EmailDeliveryError
+
+# SendGrid accepts up to 1,000 personalizations per request.
+PERSONALIZATIONS_PER_REQUEST = 1000
+
+
+def _content(message):
+    html = [content for content, mimetype in getattr(message, "alternatives", [])]
+    return message.from_email, message.subject, message.body, html[0] if html else ""
+
+
+class EmailBackend(BaseEmailBackend):
+    """
+    Messages with the same sender and content are sent in one request, with
+    a personalization per recipient so recipients don't see each other.
+    """
+
+    def __init__(self, api_key=None, fail_silently=False, **kwargs):
+        super().__init__(fail_silently=fail_silently, **kwargs)
+        self.api_key = api_key or settings.SENDGRID_API_KEY
+        self.client = None
+
+    def open(self):
+        if self.client is not None:
+            return False
+        self.client = SendGridAPIClient(self.api_key)
+        return True
+
+    def close(self):
+        self.client = None
+
+    def send_messages(self, email_messages):
+        if not email_messages:
+            return 0
+        new_client = self.open()
+        sent = 0
+        try:
+            email_messages = sorted(email_messages, key=_content)
+            for content, group in groupby(email_messages, key=_content):
+                group = list(group)
+                recipients = [
+                    recipient for message in group for recipient in message.recipients()
+                ]
+                for start in range(0, len(recipients), PERSONALIZATIONS_PER_REQUEST):
+                    self._send(
+                        content,
+                        recipients[start : start + PERSONALIZATIONS_PER_REQUEST],
+                    )
+                sent += len(group)
+        except (HTTPError, OSError) as e:
+            if not self.fail_silently:
+                raise EmailDeliveryError(f"sendgrid: {e}") from e
+        finally:
+            if new_client:
+                self.close()
+        return sent
+
+    def _send(self, content, recipients):
+        from_email, subject, body, html_body = content
+        mail = Mail(
+            from_email=from_email,
+            subject=subject,
+            plain_text_content=body,
+            html_content=html_body or None,
+        )
+        for recipient in recipients:
+            personalization = Personalization()
+            personalization.add_to(To(recipient))
+            mail.add_personalization(personalization)
+        with track_outbound("sendgrid"):
+            self.client.send(mail)
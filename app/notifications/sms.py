@@ -0,0 +1,39 @@
+from app.notifications import outbox
+from app.notifications.models import OutboundSMS
+from app.notifications.providers import get_gateway
+
+# Messages per gateway call. Textlocal's bulk endpoint takes a different
+# text per number, so OTPs, which all differ, still share calls.
+MESSAGES_PER_REQUEST = 1000
+
+
+def enqueue_sms(phone, message):
+    return OutboundSMS.objects.create(phone=phone, message=message)
+
+
+def claim_batch(batch_size):
+    return outbox.claim_batch(OutboundSMS, batch_size)
+
+
+def deliver(messages):
+    """
+    Sends claimed messages, up to MESSAGES_PER_REQUEST per gateway call.
+    Only the messages no provider could send are marked for retry. Returns
+    the number of messages sent.
+    """
+    sent = 0
+    for start in range(0, len(messages), MESSAGES_PER_REQUEST):
+        chunk = messages[start : start + MESSAGES_PER_REQUEST]
+        failed = get_gateway().send_many(
+            [(message.phone, message.message) for message in chunk]
+        )
+        delivered = []
+        for message in chunk:
+            error = failed.get((message.phone, message.message))
+            if error is None:
+                delivered.append(message)
+            else:
+                outbox.mark_failed([message], error)
+        outbox.mark_sent(OutboundSMS, delivered)
+        sent += len(delivered)
+    return sent
@@ -0,0 +1,200 @@
+import asyncio
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils.timezone import now
+
+from app.notifications import outbox, sms
+from app.notifications.models import OutboundSMS
+from app.notifications.providers import (
+    CircuitBreaker,
+    FailoverGateway,
+    SMSProvider,
+    SMSProviderError,
+    TextlocalProvider,
+)
+
+
+def textlocal_response(result):
+    response = mock.Mock(status_code=200)
+    response.json.return_value = result
+    return response
+
+
+@mock.patch("app.api.textlocal.session.post")
+class TextlocalBulkTests(SimpleTestCase):
+    messages = [("919000000001", "OTP 1"), ("919000000002", "OTP 2")]
+
+    def test_sent(self, post):
+        post.return_value = textlocal_response(
+            {
+                "status": "success",
+                "messages": [
+                    {"id": "1", "recipient": 919000000001},
+                    {"id": "2", "recipient": 919000000002},
+                ],
+            }
+        )
+        self.assertEqual(TextlocalProvider().send_many(self.messages), {})
+
+    def test_partial_failure(self, post):
+        post.return_value = textlocal_response(
+            {
+                "status": "failure",
+                "messages": [{"id": "1", "recipient": 919000000001}],
+                "errors": [
+                    {"code": 51, "message": "Invalid number", "number": 919000000002}
+                ],
+            }
+        )
+        self.assertEqual(
+            TextlocalProvider().send_many(self.messages),
+            {("919000000002", "OTP 2"): "textlocal: Invalid number"},
+        )
+
+    def test_whole_call_failure(self, post):
+        post.return_value = textlocal_response(
+            {"status": "failure", "errors": [{"code": 3, "message": "Bad key"}]}
+        )
+        with self.assertRaises(SMSProviderError):
+            TextlocalProvider().send_many(self.messages)
+
+
+class StubProvider(SMSProvider):
+    def __init__(self, name, rejects=(), down=False):
+        self.name = name
+        self.rejects = set(rejects)
+        self.down = down
+        self.calls = []
+
+    def send(self, numbers, message):
+        self.calls.append(list(numbers))
+        if self.down:
+            raise SMSProviderError(f"{self.name}: down")
+        return {
+            number: f"{self.name}: rejected"
+            for number in numbers
+            if number in self.rejects
+        }
+
+
+@mock.patch("app.notifications.providers.time")
+class CircuitBreakerTests(SimpleTestCase):
+    def test_opens_after_threshold_and_half_opens(self, time):
+        time.monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        time.monotonic.return_value = 130.0
+        self.assertTrue(breaker.allow())
+        # A failure while half-open reopens it straight away.
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+    def test_success_closes(self, time):
+        time.monotonic.return_value = 100.0
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+
+
+class FailoverGatewayTests(SimpleTestCase):
+    def test_fails_over_only_rejected_numbers(self):
+        primary = StubProvider("primary", rejects={"2"})
+        secondary = StubProvider("secondary")
+        gateway = FailoverGateway([primary, secondary])
+        self.assertEqual(gateway.send_many([("1", "OTP"), ("2", "OTP")]), {})
+        self.assertEqual(primary.calls, [["1", "2"]])
+        self.assertEqual(secondary.calls, [["2"]])
+
+    def test_reports_errors_from_every_provider(self):
+        gateway = FailoverGateway(
+            [
+                StubProvider("primary", rejects={"2"}),
+                StubProvider("secondary", down=True),
+            ]
+        )
+        self.assertEqual(
+            gateway.send_many([("1", "OTP"), ("2", "OTP")]),
+            {("2", "OTP"): "primary: rejected; secondary: down"},
+        )
+        with self.assertRaisesMessage(SMSProviderError, "secondary: down"):
+            gateway.send(["2"], "OTP")
+
+    def test_failing_provider_sorts_last_and_trips_breaker(self):
+        primary = StubProvider("primary", down=True)
+        secondary = StubProvider("secondary")
+        gateway = FailoverGateway([primary, secondary])
+        gateway.send(["1"], "OTP")
+        self.assertEqual(gateway.ordered_providers(), [secondary, primary])
+
+        secondary.down = True
+        for _ in range(3):
+            with self.assertRaises(SMSProviderError):
+                gateway.send(["1"], "OTP")
+        self.assertEqual(gateway.ordered_providers(), [])
+        self.assertEqual(
+            gateway.send_many([("1", "OTP")]),
+            {("1", "OTP"): "no SMS provider available"},
+        )
+
+    def test_send_async_fails_over(self):
+        primary = StubProvider("primary", down=True)
+        secondary = StubProvider("secondary")
+        gateway = FailoverGateway([primary, secondary])
+        asyncio.run(gateway.send_async(["1", "1"], "OTP"))
+        self.assertEqual(secondary.calls, [["1"]])
+
+
+class OutboundSMSQueueTests(TestCase):
+    def setUp(self):
+        self.messages = [
+            sms.enqueue_sms(f"91900000000{index}", "OTP") for index in range(3)
+        ]
+        OutboundSMS.objects.create(
+            phone="919000000009",
+            message="OTP",
+            next_attempt_at=now() + timedelta(hours=1),
+        )
+
+    def test_claimed_messages_are_hidden_from_other_workers(self):
+        for skip_locked in (True, False):
+            with self.subTest(skip_locked=skip_locked), mock.patch.object(
+                connection.features, "has_select_for_update_skip_locked", skip_locked
+            ):
+                OutboundSMS.objects.update(attempts=0)
+                OutboundSMS.objects.filter(pk__in=[m.pk for m in self.messages]).update(
+                    next_attempt_at=now()
+                )
+                first = sms.claim_batch(2)
+                second = sms.claim_batch(2)
+                self.assertEqual(first + second, self.messages)
+                self.assertEqual(sms.claim_batch(2), [])
+                self.assertEqual([message.attempts for message in first], [1, 1])
+
+    @mock.patch("app.notifications.sms.get_gateway")
+    def test_deliver_retries_only_failed_messages(self, get_gateway):
+        get_gateway.return_value = FailoverGateway(
+            [StubProvider("primary", rejects={"919000000001"})]
+        )
+        self.assertEqual(sms.deliver(sms.claim_batch(10)), 2)
+        statuses = dict(OutboundSMS.objects.values_list("phone", "status"))
+        self.assertEqual(statuses["919000000000"], "sent")
+        failed = OutboundSMS.objects.get(phone="919000000001")
+        self.assertEqual((failed.status, failed.attempts), ("queued", 1))
+        self.assertEqual(failed.last_error, "primary: rejected")
+        self.assertGreater(failed.next_attempt_at, now())
+
+    def test_gives_up_after_max_attempts(self):
+        message = self.messages[0]
+        message.attempts = outbox.MAX_ATTEMPTS
+        outbox.mark_failed([message], "down")
+        message.refresh_from_db()
+        self.assertEqual(message.status, "failed")
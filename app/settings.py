@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -44,12 +46,15 @@ INSTALLED_APPS = [
     # "django.contrib.staticfiles",
     "app.accounts",
     "app.issues",
+    "app.notifications",
     "rest_framework",
     # "djoser",
     "rest_framework.authtoken",
 ]
 
 MIDDLEWARE = [
+    "app.common.instrumentation.InstrumentationMiddleware",
+    "app.common.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -63,9 +68,19 @@ ROOT_URLCONF = "app.urls"
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
-        "APP_DIRS": True,
+        "DIRS": [os.path.join(BASE_DIR, "templates")],
         "OPTIONS": {
+            # Keep compiled templates in memory even when DEBUG is on, since
+            # emails are rendered on every request that queues one.
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -101,6 +116,56 @@ if os.getenv("PROD_ENV") == "true":
         }
     }
 
+# Read replicas, see app.common.db_router. DB_REPLICA_HOSTS is a comma
+# separated list of MySQL hosts sharing the primary's credentials, or
+# without PROD_ENV of SQLite files standing in for replicas. Tests mirror
+# the primary on every replica, as replication would.
+DATABASE_REPLICAS = []
+for location in filter(None, os.getenv("DB_REPLICA_HOSTS", "").split(",")):
+    alias = f"replica{len(DATABASE_REPLICAS) + 1}"
+    if DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+        replica = {"NAME": location}
+    else:
+        replica = {"HOST": location}
+    DATABASES[alias] = dict(DATABASES["default"], TEST={"MIRROR": "default"}, **replica)
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ["app.common.db_router.ReplicaRouter"]
+# Seconds a client that wrote keeps reading from the primary, which should
+# cover the replication lag.
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "app.common.cache.LocMemCache",
+        "LOCATION": "cvc19",
+    }
+}
+
+if os.getenv("MEMCACHED_LOCATION"):
+    CACHES = {
+        "default": {
+            "BACKEND": "app.common.cache.MemcachedCache",
+            "LOCATION": os.getenv("MEMCACHED_LOCATION").split(","),
+            "KEY_PREFIX": "cvc19",
+        }
+    }
+elif os.getenv("PROD_ENV") == "true":
+    # Token revocation and taxonomy invalidation must reach every worker,
+    # which a per-process cache cannot do.
+    raise ImproperlyConfigured("MEMCACHED_LOCATION must be set when PROD_ENV is true.")
+
+# Access to /internal/metrics and X-Profile request profiling: a shared
+# token when set, otherwise (outside production only) requests from
+# INTERNAL_IPS. Behind a reverse proxy every request comes from the proxy's
+# address, so production never trusts REMOTE_ADDR.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+INTERNAL_IPS = os.getenv("INTERNAL_IPS", "127.0.0.1").split(",")
+METRICS_ALLOW_INTERNAL_IPS = os.getenv("PROD_ENV") != "true"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -110,10 +175,29 @@ AUTH_PASSWORD_VALIDATORS = [
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
     },
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",},
-    {"NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",},
+    {"NAME": "app.accounts.validators.CommonPasswordValidator",},
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",},
 ]
 
+# New passwords are hashed with PASSWORD_HASHER ("argon2" or "bcrypt"); the
+# other hashers only verify existing hashes, which are upgraded on login.
+PASSWORD_HASHERS = [
+    "app.accounts.hashers.Argon2PasswordHasher",
+    "app.accounts.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+if os.getenv("PASSWORD_HASHER") == "bcrypt":
+    PASSWORD_HASHERS[:2] = reversed(PASSWORD_HASHERS[:2])
+PASSWORD_HASHER_COST = {
+    "argon2": {
+        "time_cost": int(os.getenv("ARGON2_TIME_COST", 2)),
+        "memory_cost": int(os.getenv("ARGON2_MEMORY_COST", 19456)),  # KiB
+        "parallelism": int(os.getenv("ARGON2_PARALLELISM", 2)),
+    },
+    "bcrypt": {"rounds": int(os.getenv("BCRYPT_ROUNDS", 12))},
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/3.0/topics/i18n/
@@ -144,14 +228,99 @@ REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "app.api.authentication.SignedTokenAuthentication",
+        "app.api.authentication.CachedTokenAuthentication",
         # "rest_framework.authentication.SessionAuthentication",
     ),
+    # Proxies in front of the app. Client addresses for throttling and OTP
+    # rate limits are read from X-Forwarded-For only this many hops back, so
+    # clients cannot pick their own; 0 uses REMOTE_ADDR.
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 0)),
+    # See app.api.renderers
+    "DEFAULT_RENDERER_CLASSES": [
+        "app.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+        "app.api.renderers.MessagePackRenderer",
+    ],
+}
+
+# Resolved auth tokens are cached for TTL seconds in the shared cache and
+# LOCAL_TTL seconds in a per-process LRU of up to LOCAL_MAX_SIZE entries.
+# Without memcached the "shared" cache is per-process too, so revocations
+# only reach other processes once LOCAL_TTL has passed.
+AUTH_TOKEN_CACHE = {
+    "TTL": 5 * 60 if os.getenv("MEMCACHED_LOCATION") else 10,
+    "LOCAL_TTL": 10,
+    "LOCAL_MAX_SIZE": 10000,
 }
+# Lifetime in seconds of stateless signed tokens; unset disables them.
+AUTH_SIGNED_TOKEN_MAX_AGE = int(os.getenv("AUTH_SIGNED_TOKEN_MAX_AGE", 0)) or None
 
-EMAIL_HOST = "smtp.mailgun.org"
-EMAIL_PORT = 587
-EMAIL_HOST_USER = "postmaster@mg.penciljar.studio"
+EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.mailgun.org")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", 587))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "postmaster@mg.penciljar.studio")
 EMAIL_HOST_PASSWORD = os.getenv("MAILGUN_SMTP_PASSWORD")
-EMAIL_USE_TLS = True
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS") != "false"
 # EMAIL_USE_SSL = True
+# HTTP API used by the async email route, which cannot block on SMTP.
+MAILGUN_API_URL = os.getenv(
+    "MAILGUN_API_URL", "https://api.mailgun.net/v3/mg.penciljar.studio"
+)
+MAILGUN_API_KEY = os.getenv("MAILGUN_API_KEY")
+SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+if SENDGRID_API_KEY:
+    EMAIL_BACKEND = "app.notifications.sendgrid.EmailBackend"
+# "queue" hands emails to the send_queued_email worker, "inline" sends them
+# within the request and only queues them if delivery fails.
+EMAIL_DELIVERY = os.getenv("EMAIL_DELIVERY", "queue")
+
+# Outbound SMS providers, see app.notifications.providers
+SMS_PROVIDERS = ["app.notifications.providers.TextlocalProvider"]
+if os.getenv("TWILIO_ACCOUNT_SID"):
+    SMS_PROVIDERS.append("app.notifications.providers.TwilioProvider")
+
+# One time passwords
+OTP_BACKEND = "app.accounts.otp.DatabaseOTPBackend"
+OTP_EXPIRY_SECONDS = 10 * 60
+# Limits in front of the OTP endpoint as (requests, window in seconds), and
+# the window in which duplicate requests share one send.
+OTP_RATE_LIMITS = {
+    "phone": (3, 10 * 60),
+    "ip": (30, 60),
+}
+OTP_DEDUPE_SECONDS = 30
+# "queue" hands OTP messages to the send_queued_sms worker, "inline" sends
+# them within the request and only queues them if the gateway fails.
+OTP_DELIVERY = os.getenv("OTP_DELIVERY", "queue")
+
+# Largest list accepted by POST /api/v1/issues/bulk/
+ISSUE_BULK_MAX_ITEMS = 5000
+
+# Non-staff users of /api/v1/issues/clusters/ get cells no finer than this
+# geohash precision (about 1.2 x 0.6 km) holding at least this many issues.
+ISSUE_CLUSTERS_PUBLIC_MAX_PRECISION = 6
+ISSUE_CLUSTERS_PUBLIC_MIN_COUNT = 5
+
+# Largest radius_km accepted with ?near= on /api/v1/issues/
+ISSUE_NEAR_MAX_RADIUS_KM = 50
+
+# Full-text search behind ?q= on /api/v1/issues/, see app.issues.search
+ISSUE_SEARCH_BACKEND = "app.issues.search.InvertedIndexBackend"
+if os.getenv("PROD_ENV") == "true":
+    ISSUE_SEARCH_BACKEND = "app.issues.search.MySQLFulltextBackend"
+
+# Pub/sub behind the /api/v1/issue-events/ stream, see app.issues.events.
+# The in-memory backend only reaches streams in the process that saved the
+# issue, so deployments with more than one process need Redis.
+ISSUE_EVENTS_REDIS_URL = os.getenv("REDIS_URL")
+ISSUE_EVENTS_BACKEND = "app.issues.events.InMemoryBackend"
+if ISSUE_EVENTS_REDIS_URL:
+    ISSUE_EVENTS_BACKEND = "app.issues.events.RedisBackend"
+
+# Issues with this status wait in the reviewer queue, and a claimed issue is
+# leased to its reviewer for REVIEW_LEASE_SECONDS.
+REVIEW_QUEUE_STATUS = "pending"
+REVIEW_LEASE_SECONDS = 10 * 60
+
+# Seconds /api/v1/stats/ responses are cached for, server and client side.
+ISSUE_STATS_MAX_AGE = 5
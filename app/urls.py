@@ -17,8 +17,10 @@ from django.contrib import admin
 from django.urls import include, path
 
 from app.api import urls as api_urls
+from app.common.instrumentation import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include(api_urls)),
+    path("internal/metrics", metrics_view),
 ]
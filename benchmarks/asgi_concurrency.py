@@ -0,0 +1,175 @@
+"""
+Compares the OTP endpoint served by sync WSGI workers with the same number
+of ASGI workers while the SMS gateway is slow.
+
+The gateway is simulated by a local stub that sleeps before answering, so
+every request spends most of its time waiting on I/O:
+
+    python -m benchmarks.asgi_concurrency --delay 0.5 --concurrency 100
+
+Requires gunicorn and uvicorn.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVERS = {
+    "wsgi": ["app.wsgi:application"],
+    "asgi": ["app.asgi:application", "-k", "uvicorn.workers.UvicornWorker"],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gateway(delay):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            body = json.dumps({"status": "success"}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_POST = do_GET
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", free_port()), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def wait_for(server, port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline and server.poll() is None:
+        try:
+            socket.create_connection(("127.0.0.1", port), 0.5).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+async def load(base_url, requests, concurrency):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(f"98{i:08d}")
+
+    async def worker(client):
+        nonlocal errors
+        while not queue.empty():
+            phone = queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await client.get("/api/otp/", params={"phone": phone})
+                if response.status_code != 200 or not response.json()["success"]:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=120
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+
+def run(kind, args, env):
+    port = free_port()
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        *SERVERS[kind],
+        "--workers",
+        str(args.workers),
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--log-level",
+        "warning",
+    ]
+    server = subprocess.Popen(command, cwd=ROOT, env=env)
+    try:
+        wait_for(server, port)
+        latencies, errors, elapsed = asyncio.run(
+            load(f"http://127.0.0.1:{port}", args.requests, args.concurrency)
+        )
+    finally:
+        server.terminate()
+        server.wait()
+    latencies.sort()
+    return {
+        "server": kind,
+        "throughput": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "p99": latencies[int(len(latencies) * 0.99) - 1],
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    gateway = start_gateway(args.delay)
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="benchmarks.settings",
+        BENCHMARK_SMS_PROVIDER="app.notifications.providers.TextlocalProvider",
+        TEXTLOCAL_URL=f"http://127.0.0.1:{gateway.server_port}/send/",
+        # Keeps concurrent requests from contending for SQLite's write lock.
+        OTP_BACKEND="app.accounts.otp.CacheOTPBackend",
+    )
+    subprocess.run(
+        [sys.executable, "manage.py", "migrate", "-v0"], cwd=ROOT, env=env, check=True
+    )
+
+    print(
+        f"{args.requests} requests, concurrency {args.concurrency}, "
+        f"{args.workers} workers, gateway delay {args.delay}s"
+    )
+    print(f"{'server':8}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'errors':>8}")
+    for kind in SERVERS:
+        result = run(kind, args, env)
+        print(
+            f"{result['server']:8}{result['throughput']:10.1f}"
+            f"{result['p50']:10.3f}{result['p95']:10.3f}{result['p99']:10.3f}"
+            f"{result['errors']:8}"
+        )
+    gateway.shutdown()
+
+
+if __name__ == "__main__":
+    main()
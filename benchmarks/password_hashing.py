@@ -0,0 +1,70 @@
+"""
+Measures CPU time per login for each password hasher, through the login
+endpoint against the benchmark database:
+
+    python -m benchmarks.password_hashing --logins 50
+
+Costs come from PASSWORD_HASHER_COST, so ARGON2_* and BCRYPT_ROUNDS can be
+varied to pick a policy. The django-pbkdf2 row is Django's default hasher,
+which this project used before.
+"""
+
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+
+PASSWORD = "correct-horse-battery"
+
+HASHERS = {
+    "argon2": "app.accounts.hashers.Argon2PasswordHasher",
+    "bcrypt": "app.accounts.hashers.BCryptSHA256PasswordHasher",
+    "django-pbkdf2": "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+}
+
+
+def measure(name, hasher, logins):
+    username = f"hasher-{name}"
+    with override_settings(PASSWORD_HASHERS=[hasher]):
+        User.objects.filter(username=username).delete()
+        User.objects.create_user(username, password=PASSWORD)
+        client = Client(SERVER_NAME="localhost")
+        data = {"username": username, "password": PASSWORD}
+        client.post("/api/v1/auth/login/", data)
+        cpu_started = time.process_time()
+        wall_started = time.perf_counter()
+        for _ in range(logins):
+            response = client.post("/api/v1/auth/login/", data)
+            assert response.status_code == 200, response.content
+        cpu = (time.process_time() - cpu_started) / logins
+        wall = (time.perf_counter() - wall_started) / logins
+    return cpu, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU per login by hasher.")
+    parser.add_argument("--logins", type=int, default=50)
+    args = parser.parse_args()
+
+    call_command("migrate", verbosity=0)
+    print(f"argon2 {settings.PASSWORD_HASHER_COST['argon2']}")
+    print(f"bcrypt {settings.PASSWORD_HASHER_COST['bcrypt']}\n")
+    print(
+        f"{'hasher':16}{'cpu ms/login':>14}{'wall ms/login':>15}{'logins/s/core':>15}"
+    )
+    for name, hasher in HASHERS.items():
+        cpu, wall = measure(name, hasher, args.logins)
+        print(f"{name:16}{cpu * 1000:14.1f}{wall * 1000:15.1f}{1 / cpu:15.0f}")
+
+
+if __name__ == "__main__":
+    main()
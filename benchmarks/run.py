@@ -0,0 +1,157 @@
+"""
+Runs the API scenarios against the seeded benchmark database and reports
+latency percentiles, throughput and database queries per request:
+
+    python -m benchmarks.seed --scale 100k
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json
+
+Requests go through Django's test client in-process, so the numbers cover
+the application and database but not the HTTP server. SMS is sent to the
+in-memory FakeProvider. With --baseline, exits non-zero when a scenario's
+p95 latency or throughput regressed beyond --tolerance, or it runs more
+queries than before.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from itertools import count
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from app.notifications.providers import FakeProvider  # noqa: E402
+from benchmarks.seed import PASSWORD, username  # noqa: E402
+
+phones = count(8000000000)
+
+
+def login(client, token):
+    return client.post(
+        "/api/v1/auth/login/", {"username": username(0), "password": PASSWORD}
+    )
+
+
+def issues(client, token):
+    return client.get("/api/v1/issues/", HTTP_AUTHORIZATION=f"Token {token}")
+
+
+def issue_types(client, token):
+    return client.get("/api/v1/issue-types/", HTTP_AUTHORIZATION=f"Token {token}")
+
+
+def otp(client, token):
+    return client.get("/api/otp/", {"phone": str(next(phones))})
+
+
+SCENARIOS = {
+    "login": login,
+    "issues": issues,
+    "issue-types": issue_types,
+    "otp": otp,
+}
+
+
+def run_scenario(scenario, token, iterations, warmup):
+    client = Client(SERVER_NAME="localhost")
+    for _ in range(warmup):
+        scenario(client, token)
+    latencies = []
+    queries = 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = scenario(client, token)
+            latencies.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.content[:200]}")
+        queries += len(captured)
+    FakeProvider.outbox.clear()
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "throughput": len(latencies) / sum(latencies),
+        "queries": queries / iterations,
+    }
+
+
+def regressions(name, result, baseline, tolerance):
+    found = []
+    if result["p95"] > baseline["p95"] * (1 + tolerance):
+        found.append(f"p95 {baseline['p95']:.1f}ms -> {result['p95']:.1f}ms")
+    if result["throughput"] < baseline["throughput"] * (1 - tolerance):
+        found.append(
+            f"throughput {baseline['throughput']:.0f} -> {result['throughput']:.0f}"
+        )
+    if result["queries"] > baseline["queries"]:
+        found.append(f"queries {baseline['queries']:g} -> {result['queries']:g}")
+    return [f"{name}: {regression}" for regression in found]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API benchmarks.")
+    parser.add_argument(
+        "scenarios", nargs="*", help=f"Any of {', '.join(SCENARIOS)} (default: all)."
+    )
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--baseline", help="Compare against this results file.")
+    parser.add_argument("--save-baseline", help="Write the results to this file.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown before a regression is reported.",
+    )
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    token = Token.objects.get(user__username=username(0)).key
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    failures = []
+    print(
+        f"{'scenario':14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        f"{'req/s':>9}{'queries':>9}"
+    )
+    for name in args.scenarios or SCENARIOS:
+        result = results[name] = run_scenario(
+            SCENARIOS[name], token, args.iterations, args.warmup
+        )
+        print(
+            f"{name:14}{result['p50']:9.2f}{result['p95']:9.2f}{result['p99']:9.2f}"
+            f"{result['throughput']:9.0f}{result['queries']:9.1f}"
+        )
+        if name in baseline:
+            failures += regressions(name, result, baseline[name], args.tolerance)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if failures:
+        print("\nRegressions against the baseline:")
+        print("\n".join(f"  {failure}" for failure in failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
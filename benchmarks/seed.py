@@ -0,0 +1,168 @@
+"""
+Fills the benchmark database with synthetic users, issue types, issues and
+one time passwords:
+
+    python -m benchmarks.seed --scale 100k
+
+`--scale` is the number of issues (10k, 100k or 1M); users and one time
+passwords are a tenth of that. Every seeded user has the password in
+PASSWORD, and rollup tables are rebuilt once the issues are in.
+"""
+
+import argparse
+import os
+import random
+import time
+from datetime import timedelta
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.utils.timezone import now  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from app.accounts.models import OneTimePassword  # noqa: E402
+from app.issues.models import (  # noqa: E402
+    PRIORITY_LEVEL_CHOICES,
+    STATUS_CHOICES,
+    Issue,
+    IssueSubType,
+    IssueType,
+)
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000}
+PASSWORD = "benchmark-password"
+ISSUE_TYPES = 20
+SUB_TYPES_PER_TYPE = 5
+BATCH_SIZE = 5000
+WORDS = (
+    "food ration water shortage medicine oxygen hospital bed ambulance "
+    "quarantine mask sanitizer rent wages migrant transport shelter village "
+    "ward district testing vaccine pension elderly children school"
+).split()
+
+
+def username(i):
+    return f"bench{i}"
+
+
+def phone(i):
+    return f"91{7000000000 + i}"
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def batched(objects, model):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seed_users(count):
+    # Hashing once keeps seeding fast; login still verifies at full cost.
+    password = make_password(PASSWORD)
+    batched((User(username=username(i), password=password) for i in range(count)), User)
+    user_ids = list(User.objects.order_by("id").values_list("id", flat=True))
+    batched((Token(key=Token().generate_key(), user_id=pk) for pk in user_ids), Token)
+    return user_ids
+
+
+def seed_issue_types():
+    IssueType.objects.bulk_create(
+        IssueType(name=f"Type {i}") for i in range(ISSUE_TYPES)
+    )
+    types = list(IssueType.objects.order_by("id"))
+    IssueSubType.objects.bulk_create(
+        IssueSubType(name=f"{issue_type.name}.{i}", parent=issue_type)
+        for issue_type in types
+        for i in range(SUB_TYPES_PER_TYPE)
+    )
+    sub_types = {}
+    for sub_type in IssueSubType.objects.all():
+        sub_types.setdefault(sub_type.parent_id, []).append(sub_type.pk)
+    return [(issue_type.pk, sub_types[issue_type.pk]) for issue_type in types]
+
+
+def seed_issues(count, user_ids, types, rng):
+    statuses = [choice for choice, label in STATUS_CHOICES]
+    priorities = [choice for choice, label in PRIORITY_LEVEL_CHOICES]
+
+    def issues():
+        for i in range(count):
+            type_id, sub_type_ids = rng.choice(types)
+            issue = Issue(
+                owner_id=user_ids[i % len(user_ids)],
+                title=sentence(rng, 5),
+                description=sentence(rng, 30),
+                status=rng.choice(statuses),
+                priority=rng.choice(priorities),
+                type_id=type_id,
+                sub_type_id=rng.choice(sub_type_ids),
+                # Roughly the extent of India.
+                latitude=round(rng.uniform(8, 35), 6),
+                longitude=round(rng.uniform(68, 97), 6),
+            )
+            issue.set_geohash()
+            issue.set_priority_rank()
+            yield issue
+
+    batched(issues(), Issue)
+
+
+def seed_otps(count, rng):
+    current_time = now()
+    batched(
+        (
+            OneTimePassword(
+                phone=phone(i),
+                code=OneTimePassword.generate_code(),
+                used=rng.random() < 0.8,
+            )
+            for i in range(count)
+        ),
+        OneTimePassword,
+    )
+    # Spread generation times over the past week so expiry filters matter.
+    for start in range(0, count, BATCH_SIZE):
+        OneTimePassword.objects.filter(
+            phone__in=[phone(i) for i in range(start, min(start + BATCH_SIZE, count))]
+        ).update(generated_at=current_time - timedelta(hours=rng.uniform(0, 168)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the benchmark database.")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    issues = SCALES[args.scale]
+    started = time.time()
+    call_command("migrate", verbosity=0)
+    call_command("flush", interactive=False, verbosity=0)
+    user_ids = seed_users(issues // 10)
+    types = seed_issue_types()
+    seed_issues(issues, user_ids, types, rng)
+    seed_otps(issues // 10, rng)
+    call_command("rebuild_issue_tiles", verbosity=0)
+    call_command("rebuild_issue_stats", verbosity=0)
+    print(
+        f"Seeded {len(user_ids)} users, {issues} issues and {issues // 10} one "
+        f"time passwords in {time.time() - started:.0f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measures CPU time to load and render 1,000 issues for each list
+serialization path, against the seeded benchmark database:
+
+    python -m benchmarks.seed --scale 10k
+    python -m benchmarks.serialization --iterations 20
+
+"drf" is IssueSerializer with DRF's JSONRenderer, which /api/v1/issues/
+used before; the other rows use ValuesSerializer, the list fast path, with
+each renderer and with a sparse `?fields=` selection.
+"""
+
+import argparse
+import os
+import time
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from app.api.renderers import MessagePackRenderer, ORJSONRenderer  # noqa: E402
+from app.api.serializers import IssueSerializer, ValuesSerializer  # noqa: E402
+from app.issues.models import Issue  # noqa: E402
+
+SPARSE_FIELDS = ["id", "status", "latitude", "longitude"]
+
+
+def drf(queryset, renderer):
+    fields = IssueSerializer.Meta.fields
+    data = IssueSerializer(queryset.only(*fields), many=True).data
+    return renderer.render(data)
+
+
+def values(queryset, renderer, fields=None):
+    serializer = ValuesSerializer(IssueSerializer(context={"fields": fields}))
+    rows = queryset.values(*serializer.columns)
+    return renderer.render(serializer.to_representation(rows))
+
+
+SCENARIOS = {
+    "drf": lambda queryset: drf(queryset, JSONRenderer()),
+    "values": lambda queryset: values(queryset, JSONRenderer()),
+    "values+orjson": lambda queryset: values(queryset, ORJSONRenderer()),
+    "values+msgpack": lambda queryset: values(queryset, MessagePackRenderer()),
+    "sparse+orjson": lambda queryset: values(queryset, ORJSONRenderer(), SPARSE_FIELDS),
+}
+
+
+def measure(scenario, queryset, iterations):
+    scenario(queryset)
+    started = time.process_time()
+    for _ in range(iterations):
+        body = scenario(queryset)
+    return (time.process_time() - started) / iterations, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare list serialization CPU.")
+    parser.add_argument("--issues", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    queryset = Issue.objects.order_by("-created_at", "-id")[: args.issues]
+    if queryset.count() < args.issues:
+        raise SystemExit("Not enough issues, run python -m benchmarks.seed first")
+
+    baseline = None
+    print(f"{'path':16}{'cpu ms/1k':>11}{'speedup':>9}{'bytes/1k':>10}")
+    for name, scenario in SCENARIOS.items():
+        cpu, size = measure(scenario, queryset, args.iterations)
+        baseline = baseline or cpu
+        scale = 1000 / args.issues
+        print(
+            f"{name:16}{cpu * scale * 1000:11.1f}{baseline / cpu:8.1f}x"
+            f"{size * scale:10.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Settings for running the benchmarks against a throwaway database, with
+limits that would otherwise throttle synthetic load turned off.
+"""
+
+import os
+
+from app.settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.getenv("BENCHMARK_DATABASE", "/tmp/cvc19-benchmark.sqlite3"),
+    }
+}
+DATABASE_REPLICAS = []
+
+OTP_BACKEND = os.getenv("OTP_BACKEND", "app.accounts.otp.DatabaseOTPBackend")
+OTP_DELIVERY = os.getenv("OTP_DELIVERY", "inline")
+OTP_RATE_LIMITS = {
+    "phone": (10 ** 9, 1),
+    "ip": (10 ** 9, 1),
+}
+SMS_PROVIDERS = [
+    os.getenv("BENCHMARK_SMS_PROVIDER", "app.notifications.providers.FakeProvider")
+]